@@ -0,0 +1,11 @@
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    База между тестами откатывается, а кеш — нет: новый объект с тем же
+    pk получил бы закешированные страницы прошлого теста.
+    """
+    cache.clear()
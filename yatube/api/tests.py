@@ -0,0 +1,143 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.testing import OnCommitMixin
+from posts.models import Comment, Follow, Group, Post
+from posts.utils import COMMENTS_PER_PAGE
+
+User = get_user_model()
+
+
+class FeedApiTestClass(OnCommitMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=cls.author, group=cls.group)
+            for i in range(13)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def test_feeds_return_json(self):
+        post = Post.objects.first()
+        urls = {
+            reverse('api:index'): 10,
+            reverse('api:group_post', args=[self.group.slug]): 10,
+            reverse('api:profile', args=[self.author.username]): 10,
+        }
+        for url, count in urls.items():
+            with self.subTest(url=url):
+                data = self.client.get(url).json()
+                self.assertEqual(len(data['results']), count)
+                self.assertEqual(data['results'][0]['id'], post.pk)
+                self.assertEqual(data['results'][0]['group'], 'group')
+                self.assertIsNotNone(data['next_cursor'])
+        data = self.client.get(
+            reverse('api:post_detail', args=[post.pk])
+        ).json()
+        self.assertEqual(data['text'], post.text)
+        self.assertEqual(data['comments'], [])
+
+    def test_post_comments_are_paged(self):
+        post = Post.objects.first()
+        Comment.objects.bulk_create(
+            Comment(post=post, author=self.reader, text=f'Комментарий {i}')
+            for i in range(COMMENTS_PER_PAGE + 3)
+        )
+        url = reverse('api:post_detail', args=[post.pk])
+        first = self.client.get(url).json()
+        self.assertEqual(len(first['comments']), COMMENTS_PER_PAGE)
+        second = self.client.get(
+            url, {'cursor': first['next_cursor']}
+        ).json()
+        self.assertEqual(second['text'], post.text)
+        self.assertEqual(len(second['comments']), 3)
+        self.assertIsNone(second['next_cursor'])
+        ids = [
+            comment['id']
+            for comment in first['comments'] + second['comments']
+        ]
+        self.assertEqual(len(set(ids)), COMMENTS_PER_PAGE + 3)
+
+    def test_cursor_paging(self):
+        url = reverse('api:index')
+        first = self.client.get(url).json()
+        second = self.client.get(
+            url, {'cursor': first['next_cursor']}
+        ).json()
+        ids = [post['id'] for post in first['results'] + second['results']]
+        self.assertEqual(
+            ids, list(Post.objects.values_list('pk', flat=True))
+        )
+        self.assertIsNone(second['next_cursor'])
+
+    def test_not_modified(self):
+        url = reverse('api:index')
+        response = self.client.get(url)
+        self.assertIn('Last-Modified', response)
+        etag = response['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.create(text='Новый пост', author=self.author)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.json()['results'][0]['text'], 'Новый пост')
+
+    def test_not_modified_without_queries(self):
+        url = reverse('api:index')
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_follow_feed(self):
+        url = reverse('api:follow_index')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+        response = self.reader_client.get(url)
+        self.assertEqual(response.json()['results'], [])
+        etag = response['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Follow.objects.create(user=self.reader, author=self.author)
+        response = self.reader_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(len(response.json()['results']), 10)
+
+    def test_author_following(self):
+        url = reverse('api:profile', args=[self.author.username])
+        data = self.client.get(url).json()
+        self.assertNotIn('author_following', data['results'][0])
+        response = self.reader_client.get(url)
+        self.assertFalse(response.json()['results'][0]['author_following'])
+        with self.captureOnCommitCallbacks(execute=True):
+            Follow.objects.create(user=self.reader, author=self.author)
+        response = self.reader_client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(response.json()['results'][0]['author_following'])
+
+    def test_missing_objects(self):
+        urls = [
+            reverse('api:group_post', args=['missing']),
+            reverse('api:profile', args=['missing']),
+            reverse('api:post_detail', args=[0]),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
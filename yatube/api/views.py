@@ -0,0 +1,146 @@
+from functools import wraps
+from hashlib import md5
+
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import condition, require_GET
+
+from core.cache import last_modified, request_scopes, request_version
+from core.paginator import CursorPaginator
+from posts.feed import FEED_KEYS, follow_feed
+from posts.follow_graph import is_following
+from posts.models import Post
+from posts.scopes import (
+    find_author, find_group, group_scope, post_scope, profile_scope
+)
+from posts.utils import COMMENTS_PER_PAGE, POSTS_PER_PAGE
+
+JSON_PARAMS = {'ensure_ascii': False, 'separators': (',', ':')}
+
+
+def versioned(*scopes):
+    """
+    Условный GET по версиям кеша: ETag и Last-Modified считаются
+    без запросов к ленте, а неизменённая лента отдаёт 304.
+
+    scopes — области версий; вызываемые получают аргументы view.
+    """
+    def etag(request, *args, **kwargs):
+        version = request_version(request, scopes, *args, **kwargs)
+        key = f'{version}|{request.get_full_path()}'
+        return md5(key.encode()).hexdigest()
+
+    def modified(request, *args, **kwargs):
+        return last_modified(
+            *request_scopes(request, scopes, *args, **kwargs)
+        )
+
+    return condition(etag_func=etag, last_modified_func=modified)
+
+
+def api_login_required(view):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse(
+                {'detail': 'Требуется авторизация'}, status=401
+            )
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+def serialize_post(post, following=None):
+    image = post.thumbnail or post.image
+    data = {
+        'id': post.pk,
+        'text': post.text,
+        'created': post.created.isoformat(),
+        'author': post.author.username,
+        'author_name': post.author.get_full_name(),
+        'group': post.group.slug if post.group else None,
+        'image': image.url if image else None,
+        'comments_count': post.comments_count,
+    }
+    if following is not None:
+        data['author_following'] = following
+    return data
+
+
+def feed_response(request, posts, keys=('created', 'pk')):
+    page = CursorPaginator(posts, POSTS_PER_PAGE, keys=keys).get_cursor_page(
+        request.GET.get('cursor')
+    )
+    following = {}
+    if request.user.is_authenticated:
+        # Подписки на авторов всей страницы — одним чтением кеша.
+        following = is_following(
+            request.user, [post.author_id for post in page]
+        )
+    return JsonResponse({
+        'results': [
+            serialize_post(post, following.get(post.author_id))
+            for post in page
+        ],
+        'next_cursor': page.next_cursor,
+        'previous_cursor': page.previous_cursor,
+    }, json_dumps_params=JSON_PARAMS)
+
+
+def follow_scope(request, *args, **kwargs):
+    """Подписки читателя: от них зависит поле author_following."""
+    if request.user.is_authenticated:
+        return f'follow:{request.user.pk}'
+    return 'follow:anonymous'
+
+
+@require_GET
+@versioned('posts', 'groups', 'users', follow_scope)
+def index(request):
+    return feed_response(request, Post.objects.for_feed())
+
+
+@require_GET
+@versioned(group_scope, 'users', follow_scope)
+def group_post(request, slug):
+    group = find_group(request, slug)
+    return feed_response(request, group.group_posts.for_feed())
+
+
+@require_GET
+@versioned(profile_scope, 'groups', 'users', follow_scope)
+def profile(request, username):
+    author = find_author(request, username)
+    return feed_response(request, author.posts.for_feed())
+
+
+@require_GET
+@versioned(post_scope, 'groups', 'users')
+def post_detail(request, post_id):
+    post = get_object_or_404(Post.objects.for_feed(), pk=post_id)
+    page = CursorPaginator(
+        post.comments.for_post(), COMMENTS_PER_PAGE
+    ).get_cursor_page(request.GET.get('cursor'))
+    data = serialize_post(post)
+    data['comments'] = [
+        {
+            'id': comment.pk,
+            'author': comment.author.username,
+            'text': comment.text,
+            'created': comment.created.isoformat(),
+        }
+        for comment in page
+    ]
+    data['next_cursor'] = page.next_cursor
+    data['previous_cursor'] = page.previous_cursor
+    return JsonResponse(data, json_dumps_params=JSON_PARAMS)
+
+
+@require_GET
+@api_login_required
+@versioned(follow_scope, 'feeds', 'posts', 'groups', 'users')
+def follow_index(request):
+    return feed_response(
+        request,
+        follow_feed(request.user).for_feed(),
+        keys=FEED_KEYS
+    )
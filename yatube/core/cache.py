@@ -0,0 +1,106 @@
+import time
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def _key(scope):
+    return f'version:{scope}'
+
+
+def _modified_key(scope):
+    return f'modified:{scope}'
+
+
+def _get_or_add(keys, default):
+    """Значения ключей кеша; отсутствующие заводятся через add."""
+    values = cache.get_many(keys)
+    missing = [key for key in keys if key not in values]
+    if missing:
+        # add, а не set: не затираем значение, записанное параллельно.
+        for key in missing:
+            cache.add(key, default, None)
+        stored = cache.get_many(missing)
+        values.update({key: stored.get(key, default) for key in missing})
+    return [values[key] for key in keys]
+
+
+def get_versions(*scopes):
+    """Версии областей по отдельности одним запросом к кешу."""
+    # Начальное значение — время, чтобы версия, заведённая заново
+    # после вытеснения, не совпала ни с одной из прежних.
+    return _get_or_add([_key(scope) for scope in scopes], time.time_ns())
+
+
+def get_version(*scopes):
+    """
+    Составная версия набора областей для ключа фрагмента кеша.
+
+    Версия области — счётчик изменений, он только растёт.
+    """
+    return '.'.join(str(version) for version in get_versions(*scopes))
+
+
+def last_modified(*scopes):
+    """
+    Время последнего изменения областей.
+
+    Хранится отдельно от версии: счётчик не связан с часами. Для
+    области без отметки ею становится текущее время.
+    """
+    stamps = _get_or_add(
+        [_modified_key(scope) for scope in scopes], time.time()
+    )
+    return datetime.fromtimestamp(max(stamps), tz=timezone.utc)
+
+
+def bump_version(*scopes):
+    """
+    Делает устаревшими все фрагменты, зависящие от областей.
+
+    Версия сдвигается атомарным incr и поэтому никогда не убывает,
+    отметка времени изменения пишется рядом отдельным ключом.
+    """
+    now = time.time()
+    for scope in scopes:
+        key = _key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Версии нет в кеше: её заведёт get_versions.
+            cache.add(key, time.time_ns(), None)
+    cache.set_many({_modified_key(scope): now for scope in scopes}, None)
+
+
+def bump_version_on_commit(*scopes):
+    """
+    bump_version после коммита текущей транзакции.
+
+    Сдвиг внутри транзакции даёт параллельному читателю закешировать
+    ещё старые строки уже под новой версией. Вне транзакции версия
+    сдвигается сразу.
+    """
+    transaction.on_commit(lambda: bump_version(*scopes))
+
+
+def request_scopes(request, scopes, *args, **kwargs):
+    """
+    Области для view: вызываемые получают аргументы view.
+    Список запоминается в запросе и считается один раз.
+    """
+    if not hasattr(request, 'cache_scopes'):
+        request.cache_scopes = [
+            scope(request, *args, **kwargs) if callable(scope) else scope
+            for scope in scopes
+        ]
+    return request.cache_scopes
+
+
+def request_version(request, scopes, *args, **kwargs):
+    """get_version областей view; запоминается в запросе."""
+    if not hasattr(request, 'cache_version'):
+        request.cache_version = get_version(
+            *request_scopes(request, scopes, *args, **kwargs)
+        )
+    return request.cache_version
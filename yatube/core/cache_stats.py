@@ -0,0 +1,130 @@
+import re
+import threading
+from collections import Counter
+
+from django.core.cache.backends.base import BaseCache
+from django.utils.module_loading import import_string
+
+from core import profiling
+
+STATS_PREFIX = 'cache_stats'
+PREFIXES_KEY = f'{STATS_PREFIX}:prefixes'
+FLUSH_EVERY = 100
+FRAGMENT_KEY = re.compile(r'^template\.cache\.([^.]+)\.')
+
+
+def key_prefix(key):
+    """Группа ключа для статистики: имя фрагмента или первый сегмент."""
+    fragment = FRAGMENT_KEY.match(key)
+    if fragment:
+        return f'fragment:{fragment.group(1)}'
+    return re.split(r'[:|]', key, 1)[0]
+
+
+class StatsCache(BaseCache):
+    """
+    Обёртка над любым бэкендом кеша, считающая попадания и промахи
+    по группам ключей.
+
+    Счётчики копятся в памяти процесса и раз в FLUSH_EVERY чтений
+    сбрасываются в сам кеш, так что общий бэкенд собирает статистику
+    со всех воркеров. Её показывает команда cache_stats.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        wrapped = dict(params['WRAPPED'])
+        self.cache = import_string(wrapped.pop('BACKEND'))(
+            wrapped.pop('LOCATION', ''), wrapped
+        )
+        self.counter = Counter()
+        self.reads = 0
+        self.lock = threading.Lock()
+
+    def record(self, key, hit):
+        profiling.count_cache(hit)
+        with self.lock:
+            self.counter[(key_prefix(key), 'hits' if hit else 'misses')] += 1
+            self.reads += 1
+            if self.reads < FLUSH_EVERY:
+                return
+            counter, self.counter, self.reads = self.counter, Counter(), 0
+        self.flush(counter)
+
+    def flush(self, counter):
+        prefixes = set(self.cache.get(PREFIXES_KEY, ()))
+        for (prefix, kind), count in counter.items():
+            prefixes.add(prefix)
+            key = f'{STATS_PREFIX}:{prefix}:{kind}'
+            if not self.cache.add(key, count, None):
+                self.cache.incr(key, count)
+        self.cache.set(PREFIXES_KEY, sorted(prefixes), None)
+
+    def stats(self):
+        """Накопленные {группа: (попадания, промахи)} со всех процессов."""
+        prefixes = self.cache.get(PREFIXES_KEY, ())
+        counts = self.cache.get_many(
+            f'{STATS_PREFIX}:{prefix}:{kind}'
+            for prefix in prefixes for kind in ('hits', 'misses')
+        )
+        return {
+            prefix: (
+                counts.get(f'{STATS_PREFIX}:{prefix}:hits', 0),
+                counts.get(f'{STATS_PREFIX}:{prefix}:misses', 0),
+            )
+            for prefix in prefixes
+        }
+
+    def reset_stats(self):
+        prefixes = self.cache.get(PREFIXES_KEY, ())
+        self.cache.delete_many(
+            [f'{STATS_PREFIX}:{prefix}:{kind}'
+             for prefix in prefixes for kind in ('hits', 'misses')]
+            + [PREFIXES_KEY]
+        )
+
+    def get(self, key, default=None, version=None):
+        missing = object()
+        value = self.cache.get(key, missing, version)
+        self.record(key, value is not missing)
+        return default if value is missing else value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        values = self.cache.get_many(keys, version)
+        for key in keys:
+            self.record(key, key in values)
+        return values
+
+    def add(self, *args, **kwargs):
+        return self.cache.add(*args, **kwargs)
+
+    def set(self, *args, **kwargs):
+        return self.cache.set(*args, **kwargs)
+
+    def set_many(self, *args, **kwargs):
+        return self.cache.set_many(*args, **kwargs)
+
+    def touch(self, *args, **kwargs):
+        return self.cache.touch(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return self.cache.delete(*args, **kwargs)
+
+    def delete_many(self, *args, **kwargs):
+        return self.cache.delete_many(*args, **kwargs)
+
+    def has_key(self, *args, **kwargs):
+        return self.cache.has_key(*args, **kwargs)
+
+    def incr(self, *args, **kwargs):
+        return self.cache.incr(*args, **kwargs)
+
+    def decr(self, *args, **kwargs):
+        return self.cache.decr(*args, **kwargs)
+
+    def clear(self):
+        return self.cache.clear()
+
+    def close(self, **kwargs):
+        return self.cache.close(**kwargs)
@@ -0,0 +1,6 @@
+from django.conf import settings
+
+
+def fragment_cache_timeout(request):
+    """Добавляет время жизни версионированных фрагментов кеша."""
+    return {'fragment_cache_timeout': settings.FRAGMENT_CACHE_TIMEOUT}
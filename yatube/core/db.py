@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.db import connections
+
+
+def apply_pragmas(cursor, pragmas):
+    for name, value in pragmas.items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """Настраивает новое соединение SQLite по SQLITE_PRAGMAS."""
+    if connection.vendor == 'sqlite' and settings.SQLITE_PRAGMAS:
+        with connection.cursor() as cursor:
+            apply_pragmas(cursor, settings.SQLITE_PRAGMAS)
+
+
+def check_connections(**kwargs):
+    """
+    Перед запросом закрывает постоянные соединения, которые перестали
+    отвечать, как CONN_HEALTH_CHECKS в Django 4.1.
+    """
+    if not settings.DB_HEALTH_CHECKS:
+        return
+    for connection in connections.all():
+        if connection.connection is not None and not connection.is_usable():
+            connection.close()
@@ -0,0 +1,68 @@
+"""
+Чтение с реплик.
+
+По умолчанию все запросы идут в основную базу. ReplicaMiddleware
+разрешает реплики только на время GET-запроса к view из
+REPLICA_VIEWS. Первая запись в запросе возвращает чтение на основную
+базу, а ответ ставит cookie, которое держит автора записи на ней
+REPLICA_STICKY_SECONDS: так он сразу видит свои изменения, даже если
+реплика отстаёт. Реплика выбирается одна на запрос, чтобы все его
+чтения видели одно и то же состояние данных.
+"""
+import random
+import threading
+
+from django.conf import settings
+
+PRIMARY = 'default'
+# Сессию с отстающей реплики SessionMiddleware сочтёт пустой и удалит
+# cookie — пользователь разлогинится. Сессии читаем только с основной.
+# Кеш в базе (CACHE_BACKEND=db) с реплики отдал бы устаревшие версии.
+PRIMARY_APPS = {'sessions', 'django_cache'}
+# Запись в кеш — не изменение данных: она не держит на основной базе.
+UNPINNED_APPS = {'django_cache'}
+
+_state = threading.local()
+
+
+def start(pinned=False):
+    _state.replica = None
+    _state.pinned = pinned
+    _state.wrote = False
+
+
+def allow_replica():
+    _state.replica = random.choice(settings.DATABASE_REPLICAS)
+
+
+def stop():
+    """Сбрасывает состояние запроса; возвращает True, если была запись."""
+    wrote = getattr(_state, 'wrote', False)
+    _state.replica = None
+    _state.pinned = _state.wrote = False
+    return wrote
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replica = getattr(_state, 'replica', None)
+        if (
+            replica
+            and not _state.pinned
+            and not _state.wrote
+            and model._meta.app_label not in PRIMARY_APPS
+        ):
+            return replica
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label not in UNPINNED_APPS:
+            _state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии основной базы, связи между ними допустимы.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
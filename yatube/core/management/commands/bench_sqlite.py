@@ -0,0 +1,123 @@
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+from collections import Counter
+from importlib import import_module
+from time import monotonic
+
+from django.core.management.base import BaseCommand
+
+from core.db import apply_pragmas
+
+PROFILES = {
+    # Как до настройки: журнал отката, соединение на каждый запрос.
+    'default': ({}, False),
+    'production': (
+        import_module('yatube.settings_production').SQLITE_PRAGMAS, True
+    ),
+}
+SCHEMA = (
+    'CREATE TABLE post (id INTEGER PRIMARY KEY, author_id INTEGER, '
+    'created REAL, text TEXT)',
+    'CREATE INDEX post_author_created ON post (author_id, created, id)',
+)
+READ = (
+    'SELECT id, created, text FROM post WHERE author_id = ? '
+    'ORDER BY created DESC, id DESC LIMIT 10'
+)
+WRITE = 'INSERT INTO post (author_id, created, text) VALUES (?, ?, ?)'
+AUTHORS = 100
+TEXT = 'Текст поста. ' * 20
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность SQLite при одновременном '
+        'чтении и записи: настройки по умолчанию против профиля '
+        'settings_production (WAL, PRAGMA, постоянные соединения).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--rows', type=int, default=100000)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'{"профиль":<12} {"чтений/с":>10} {"записей/с":>10} '
+            f'{"ошибок":>8}'
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            for name, (pragmas, persistent) in PROFILES.items():
+                path = os.path.join(directory, f'{name}.sqlite3')
+                self.seed(path, options['rows'])
+                counts = self.run(path, pragmas, persistent, options)
+                seconds = options['seconds']
+                self.stdout.write(
+                    f'{name:<12} {counts["read"] / seconds:>10.0f} '
+                    f'{counts["write"] / seconds:>10.0f} '
+                    f'{counts["errors"]:>8}'
+                )
+
+    def seed(self, path, rows):
+        connection = sqlite3.connect(path)
+        with connection:
+            for statement in SCHEMA:
+                connection.execute(statement)
+            connection.executemany(WRITE, (
+                (number % AUTHORS, number, TEXT) for number in range(rows)
+            ))
+        connection.close()
+
+    def run(self, path, pragmas, persistent, options):
+        counts = Counter()
+        lock = threading.Lock()
+        deadline = monotonic() + options['seconds']
+
+        def connect():
+            # Таймаут и автокоммит как у соединений Django.
+            connection = sqlite3.connect(
+                path, timeout=5, isolation_level=None,
+                check_same_thread=False
+            )
+            apply_pragmas(connection.cursor(), pragmas)
+            return connection
+
+        def work(kind):
+            done = Counter()
+            generator = random.Random()
+            connection = connect() if persistent else None
+            while monotonic() < deadline:
+                current = connection or connect()
+                try:
+                    author = generator.randrange(AUTHORS)
+                    if kind == 'read':
+                        current.execute(READ, (author,)).fetchall()
+                    else:
+                        current.execute(WRITE, (author, monotonic(), TEXT))
+                    done[kind] += 1
+                except sqlite3.OperationalError:
+                    done['errors'] += 1
+                finally:
+                    if not persistent:
+                        current.close()
+            if connection:
+                connection.close()
+            with lock:
+                counts.update(done)
+
+        threads = [
+            threading.Thread(target=work, args=('read',))
+            for _ in range(options['readers'])
+        ] + [
+            threading.Thread(target=work, args=('write',))
+            for _ in range(options['writers'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return counts
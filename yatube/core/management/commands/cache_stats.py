@@ -0,0 +1,33 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+
+from core.cache_stats import StatsCache
+
+
+class Command(BaseCommand):
+    help = 'Показывает долю попаданий в кеш по группам ключей.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Обнулить накопленную статистику.'
+        )
+
+    def handle(self, *args, **options):
+        if not isinstance(cache, StatsCache):
+            raise CommandError(
+                'Статистика не собирается: запустите с CACHE_STATS=1'
+            )
+        if options['reset']:
+            cache.reset_stats()
+            self.stdout.write('Статистика кеша обнулена')
+            return
+        self.stdout.write(
+            f'{"группа":<32} {"попадания":>10} {"промахи":>10} {"доля":>6}'
+        )
+        for prefix, (hits, misses) in sorted(cache.stats().items()):
+            ratio = hits / (hits + misses) if hits + misses else 0
+            self.stdout.write(
+                f'{prefix:<32} {hits:>10} {misses:>10} {ratio:>6.1%}'
+            )
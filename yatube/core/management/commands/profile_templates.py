@@ -0,0 +1,68 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+
+from core.template_profiler import TemplateProfiler
+
+User = get_user_model()
+DUMMY_CACHE = {
+    'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Профиль рендеринга страниц: время каждого шаблона, '
+        'подключённого {% include %}, и каждого тега.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='+', metavar='url')
+        parser.add_argument(
+            '--user', help='Имя пользователя, от которого идут запросы.'
+        )
+        parser.add_argument('--repeat', type=int, default=10)
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument(
+            '--warm',
+            action='store_true',
+            help='Оставить кеш: фрагменты из кеша не рендерятся, '
+                 'по умолчанию меряется рендеринг без кеша.'
+        )
+
+    def handle(self, *args, **options):
+        client = Client()
+        if options['user']:
+            try:
+                client.force_login(User.objects.get(
+                    username=options['user']
+                ))
+            except User.DoesNotExist:
+                raise CommandError(f'Нет пользователя {options["user"]}')
+        caches = {} if options['warm'] else {'CACHES': DUMMY_CACHE}
+        with override_settings(PAGE_CACHE=False, **caches):
+            for url in options['urls']:
+                # Первый запрос прогревает загрузчик шаблонов.
+                response = client.get(url)
+                if response.status_code != 200:
+                    raise CommandError(
+                        f'{url}: код ответа {response.status_code}'
+                    )
+                with TemplateProfiler() as profiler:
+                    for _ in range(options['repeat']):
+                        client.get(url)
+                self.report(url, profiler, options)
+
+    def report(self, url, profiler, options):
+        repeat = options['repeat']
+        self.stdout.write(f'{url} — среднее на запрос из {repeat}')
+        self.stdout.write(
+            f'{"":<8}{"имя":<40}{"вызовы":>8}{"всего, мс":>12}'
+            f'{"своё, мс":>12}'
+        )
+        for kind, name, timing in profiler.report()[:options['limit']]:
+            self.stdout.write(
+                f'{kind:<8}{name:<40}{timing.calls / repeat:>8g}'
+                f'{timing.total / repeat * 1000:>12.2f}'
+                f'{timing.own / repeat * 1000:>12.2f}'
+            )
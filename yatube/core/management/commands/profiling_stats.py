@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from core import profiling
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает профиль запросов по view: время ответа '
+        '(перцентили по гистограмме), база, шаблоны и кеш.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Обнулить накопленную статистику.'
+        )
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            profiling.reset()
+            self.stdout.write('Статистика запросов обнулена')
+            return
+        self.stdout.write(
+            f'{"view":<28} {"запросы":>8} {"p50":>6} {"p99":>6} '
+            f'{"ср., мс":>8} {"база":>8} {"SQL":>5} {"дубли":>6} '
+            f'{"шаблоны":>8} {"кеш":>6}'
+        )
+        for view, stats in sorted(profiling.load().items()):
+            requests = stats['requests'] or 1
+            reads = stats['cache_hits'] + stats['cache_misses']
+            ratio = stats['cache_hits'] / reads if reads else 0
+            self.stdout.write(
+                f'{view:<28} {stats["requests"]:>8} '
+                f'{profiling.percentile(stats, 0.5):>6g} '
+                f'{profiling.percentile(stats, 0.99):>6g} '
+                f'{stats["wall_us"] / requests / 1000:>8.1f} '
+                f'{stats["db_us"] / requests / 1000:>8.1f} '
+                f'{stats["queries"] / requests:>5.1f} '
+                f'{stats["duplicates"] / requests:>6.1f} '
+                f'{stats["template_us"] / requests / 1000:>8.1f} '
+                f'{ratio:>6.1%}'
+            )
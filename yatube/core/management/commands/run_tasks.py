@@ -0,0 +1,44 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core import tasks
+
+
+class Command(BaseCommand):
+    help = 'Запускает воркеры фоновых задач.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=2)
+        parser.add_argument(
+            '--poll',
+            type=float,
+            default=1.0,
+            help='Пауза между опросами пустой очереди, секунд.'
+        )
+        parser.add_argument('--batch', type=int, default=10)
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Выполнить готовые задачи и выйти.'
+        )
+
+    def handle(self, *args, **options):
+        work_options = {
+            'poll': options['poll'],
+            'once': options['once'],
+            'batch': options['batch'],
+        }
+        if options['processes'] <= 1:
+            tasks.work(**work_options)
+            return
+        # Дочерние процессы не должны унаследовать открытое соединение.
+        connections.close_all()
+        with ProcessPoolExecutor(options['processes']) as pool:
+            workers = [
+                pool.submit(tasks.work, **work_options)
+                for _ in range(options['processes'])
+            ]
+            for worker in workers:
+                worker.result()
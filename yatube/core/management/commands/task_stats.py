@@ -0,0 +1,59 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, Count, Min, Q
+from django.utils import timezone
+
+from core.models import Task
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает очередь фоновых задач: сколько ждёт, выполнено '
+        'и упало по каждой функции, задержку очереди и время работы.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--purge',
+            type=int,
+            metavar='DAYS',
+            help='Удалить выполненные задачи старше DAYS дней.'
+        )
+
+    def handle(self, *args, **options):
+        if options['purge'] is not None:
+            deleted, _ = Task.objects.filter(
+                status=Task.DONE,
+                finished__lt=timezone.now() - timedelta(
+                    days=options['purge']
+                ),
+            ).delete()
+            self.stdout.write(f'Удалено выполненных задач: {deleted}')
+            return
+        now = timezone.now()
+        rows = Task.objects.order_by('name').values('name').annotate(
+            pending=Count('pk', filter=Q(status=Task.PENDING)),
+            running=Count('pk', filter=Q(status=Task.RUNNING)),
+            done=Count('pk', filter=Q(status=Task.DONE)),
+            failed=Count('pk', filter=Q(status=Task.FAILED)),
+            retried=Count('pk', filter=Q(attempts__gt=1)),
+            oldest=Min('run_at', filter=Q(status=Task.PENDING)),
+            duration=Avg('duration', filter=Q(status=Task.DONE)),
+        )
+        self.stdout.write(
+            f'{"задача":<40} {"ждут":>6} {"идут":>6} {"готово":>7} '
+            f'{"упали":>6} {"повторы":>8} {"задержка, с":>12} '
+            f'{"время, мс":>10}'
+        )
+        for row in rows:
+            lag = (
+                max((now - row['oldest']).total_seconds(), 0)
+                if row['oldest'] else 0
+            )
+            duration = row['duration'] or 0
+            self.stdout.write(
+                f'{row["name"]:<40} {row["pending"]:>6} {row["running"]:>6} '
+                f'{row["done"]:>7} {row["failed"]:>6} {row["retried"]:>8} '
+                f'{lag:>12.1f} {duration:>10.1f}'
+            )
@@ -0,0 +1,80 @@
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from core import db_router, profiling
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+class ProfilingMiddleware:
+    """
+    Замеряет каждый запрос и отдаёт итоги в заголовке Server-Timing.
+
+    Включается настройкой PROFILING; без неё middleware исключается
+    из цепочки при старте и ничего не стоит.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING:
+            raise MiddlewareNotUsed
+        profiling.instrument_templates()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        profile = profiling.start()
+        start = perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(profile.execute)
+                    )
+                response = self.get_response(request)
+        finally:
+            profiling.stop()
+        wall = perf_counter() - start
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        response['Server-Timing'] = profile.server_timing(wall)
+        profiling.record(view, profile, wall)
+        return response
+
+
+class ReplicaMiddleware:
+    """
+    Отправляет чтение view из REPLICA_VIEWS на реплики и держит
+    на основной базе того, кто только что писал.
+
+    Без DATABASE_REPLICAS исключается из цепочки.
+    """
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        db_router.start(
+            pinned=settings.REPLICA_PIN_COOKIE in request.COOKIES
+        )
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = db_router.stop()
+        if wrote:
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE, '1',
+                max_age=settings.REPLICA_STICKY_SECONDS, httponly=True
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+            request.method in SAFE_METHODS
+            and request.resolver_match.view_name in settings.REPLICA_VIEWS
+        ):
+            db_router.allow_replica()
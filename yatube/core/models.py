@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 
 class CreatedModel(models.Model):
@@ -9,5 +10,64 @@ class CreatedModel(models.Model):
     )
 
     class Meta:
-        ordering = ["-created"]
+        ordering = ["-created", "-id"]
         abstract = True
+
+
+class Task(CreatedModel):
+    """Отложенный вызов функции, выполняемый командой run_tasks."""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Не выполнена'),
+    )
+
+    name = models.CharField('Функция', max_length=200)
+    args = models.TextField('Аргументы (JSON)', default='[]')
+    # Задачи с одним ключом в очереди не дублируются.
+    key = models.CharField(
+        'Ключ идемпотентности',
+        max_length=200,
+        blank=True,
+        null=True
+    )
+    status = models.CharField(
+        'Состояние',
+        max_length=10,
+        choices=STATUSES,
+        default=PENDING
+    )
+    attempts = models.PositiveIntegerField('Попытки', default=0)
+    max_attempts = models.PositiveIntegerField('Лимит попыток', default=5)
+    run_at = models.DateTimeField('Запустить не раньше', default=timezone.now)
+    # Задачу упавшего воркера подхватит другой, когда истечёт срок.
+    locked_until = models.DateTimeField('Занята до', blank=True, null=True)
+    started = models.DateTimeField('Начата', blank=True, null=True)
+    finished = models.DateTimeField('Завершена', blank=True, null=True)
+    duration = models.FloatField('Время работы, мс', blank=True, null=True)
+    error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta(CreatedModel.Meta):
+        verbose_name = 'Задача'
+        verbose_name_plural = 'Задачи'
+        indexes = [
+            models.Index(
+                fields=['status', 'run_at'],
+                name='task_status_run_at_idx'
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['key'],
+                condition=models.Q(status='pending'),
+                name='unique_pending_task_key'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.name}{self.args}'
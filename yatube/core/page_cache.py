@@ -0,0 +1,131 @@
+"""
+Кеш целых страниц для анонимных посетителей.
+
+Ключ страницы — адрес с нормализованными параметрами листания и
+составная версия её областей (core.cache), поэтому запись поста,
+комментария, группы или пользователя сбрасывает ровно те страницы,
+где они видны, без перебора ключей.
+
+Запросы с cookie сессии идут мимо кеша: у вошедшего пользователя своя
+шапка и кнопки подписки. Пустую или устаревшую страницу строит только
+один запрос — тот, кто взял блокировку. Остальные тем временем
+получают прошлую версию страницы, а если её нет, ненадолго ждут.
+"""
+from functools import wraps
+from hashlib import md5
+from time import monotonic, sleep
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache import request_version
+
+SAFE_METHODS = ('GET', 'HEAD')
+HEADER = 'X-Page-Cache'
+POLL_INTERVAL = 0.05
+
+
+def normalize_query(query):
+    """
+    Оставляет только параметры листания в одном виде: ?page=1,
+    ?page=abc и пустой адрес дают одну страницу, а номер меньше
+    единицы Paginator.get_page понимает как последнюю.
+    """
+    page = query.get('page')
+    if page is not None:
+        if page == 'last':
+            return {'page': 'last'}
+        try:
+            number = int(page)
+        except ValueError:
+            return {}
+        if number < 1:
+            return {'page': 'last'}
+        return {'page': number} if number > 1 else {}
+    cursor = query.get('cursor')
+    return {'cursor': cursor} if cursor else {}
+
+
+def url_key(request):
+    query = urlencode(sorted(normalize_query(request.GET).items()))
+    url = f'{request.path}?{query}'
+    return md5(url.encode()).hexdigest()
+
+
+def is_anonymous(request):
+    return settings.SESSION_COOKIE_NAME not in request.COOKIES
+
+
+def is_cacheable(request, response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        # Токен CSRF в форме привязан к cookie конкретного посетителя.
+        and not request.META.get('CSRF_COOKIE_USED')
+        and 'private' not in response.get('Cache-Control', '')
+    )
+
+
+def wait_for(key):
+    deadline = monotonic() + settings.PAGE_CACHE_LOCK_WAIT
+    while monotonic() < deadline:
+        sleep(POLL_INTERVAL)
+        response = cache.get(key)
+        if response is not None:
+            return response
+    return None
+
+
+def anonymous_page_cache(*scopes):
+    """
+    Кеширует ответ view для анонимов до изменения областей scopes.
+
+    Вызываемые области получают аргументы view, как в api.versioned.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (
+                not settings.PAGE_CACHE
+                or request.method not in SAFE_METHODS
+                or not is_anonymous(request)
+            ):
+                return view(request, *args, **kwargs)
+            url = url_key(request)
+            version = request_version(request, scopes, *args, **kwargs)
+            key = f'page:{url}:{version}'
+            latest_key = f'page:{url}:latest'
+            lock_key = f'{key}:lock'
+
+            response = cache.get(key)
+            if response is not None:
+                response[HEADER] = 'hit'
+                return response
+            locked = cache.add(
+                lock_key, 1, settings.PAGE_CACHE_LOCK_TIMEOUT
+            )
+            if not locked:
+                response = cache.get(latest_key)
+                if response is not None:
+                    response[HEADER] = 'stale'
+                    return response
+                response = wait_for(key)
+                if response is not None:
+                    response[HEADER] = 'hit'
+                    return response
+            try:
+                response = view(request, *args, **kwargs)
+                if is_cacheable(request, response):
+                    cache.set_many(
+                        {key: response, latest_key: response},
+                        settings.PAGE_CACHE_TIMEOUT
+                    )
+            finally:
+                if locked:
+                    cache.delete(lock_key)
+            response[HEADER] = 'miss'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,88 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+def encode_cursor(direction, obj, keys=('created', 'pk')):
+    """Упаковывает ключ (created, id) записи в строку для URL."""
+    created, pk = (getattr(obj, key) for key in keys)
+    raw = f'{direction}|{created.isoformat()}|{pk}'
+    return urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Распаковывает курсор. Для битого курсора бросает ValueError."""
+    padded = cursor + '=' * (-len(cursor) % 4)
+    direction, created, pk = (
+        urlsafe_b64decode(padded.encode()).decode().split('|')
+    )
+    created = parse_datetime(created)
+    if direction not in (NEXT, PREVIOUS) or created is None:
+        raise ValueError(f'Некорректный курсор: {cursor}')
+    return direction, created, int(pk)
+
+
+class CursorPaginator(Paginator):
+    """
+    Пагинатор по ключу (created, id) для моделей на основе CreatedModel.
+
+    Страница выбирается условием по последней показанной записи вместо
+    OFFSET и без COUNT(*), поэтому её выборка не дорожает с глубиной.
+    Обычная постраничная навигация (get_page) продолжает работать.
+
+    keys задаёт поля ключа, если лента упорядочена не по собственным
+    полям модели, а, например, по аннотациям из связанной таблицы.
+    """
+
+    def __init__(self, object_list, per_page, keys=('created', 'pk'),
+                 **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.keys = keys
+
+    def get_cursor_page(self, cursor=None):
+        created_key, pk_key = self.keys
+        direction = NEXT
+        if cursor:
+            try:
+                direction, created, pk = decode_cursor(cursor)
+            except ValueError:
+                cursor = None
+        queryset = self.object_list
+        if cursor and direction == PREVIOUS:
+            queryset = queryset.filter(
+                Q(**{f'{created_key}__gt': created})
+                | Q(**{created_key: created, f'{pk_key}__gt': pk})
+            ).order_by(created_key, pk_key)
+        else:
+            if cursor:
+                queryset = queryset.filter(
+                    Q(**{f'{created_key}__lt': created})
+                    | Q(**{created_key: created, f'{pk_key}__lt': pk})
+                )
+            queryset = queryset.order_by(f'-{created_key}', f'-{pk_key}')
+        objects = list(queryset[:self.per_page + 1])
+        has_more = len(objects) > self.per_page
+        objects = objects[:self.per_page]
+        if direction == PREVIOUS:
+            if not has_more:
+                # Новее показанного меньше страницы: это уже первая страница.
+                return self.get_cursor_page()
+            objects.reverse()
+        has_next = has_more or direction == PREVIOUS
+        has_previous = bool(cursor)
+        page = Page(objects, 1, self)
+        page.cursor_based = True
+        page.next_cursor = None
+        page.previous_cursor = None
+        if objects and has_next:
+            page.next_cursor = encode_cursor(NEXT, objects[-1], self.keys)
+        if objects and has_previous:
+            page.previous_cursor = encode_cursor(
+                PREVIOUS, objects[0], self.keys
+            )
+        return page
@@ -0,0 +1,199 @@
+"""
+Профилирование запросов: время ответа, запросы к базе, рендеринг
+шаблонов и обращения к кешу.
+
+Замеры текущего запроса живут в RequestProfile, который ставит
+ProfilingMiddleware. Итоги по view копятся в памяти процесса и раз в
+FLUSH_EVERY запросов сбрасываются в кеш, откуда их читает команда
+profiling_stats: так собирается статистика со всех воркеров.
+"""
+import threading
+from collections import Counter, defaultdict
+from functools import wraps
+from time import perf_counter
+
+from django.core.cache import cache
+from django.template.base import Template
+
+PREFIX = 'profiling'
+VIEWS_KEY = f'{PREFIX}:views'
+FLUSH_EVERY = 100
+# Верхние границы корзин гистограммы времени ответа, мс.
+BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+FIELDS = (
+    'requests', 'wall_us', 'db_us', 'template_us', 'queries',
+    'duplicates', 'cache_hits', 'cache_misses',
+) + tuple(f'le_{bucket}' for bucket in BUCKETS) + ('le_inf',)
+
+_local = threading.local()
+_lock = threading.Lock()
+_pending = defaultdict(Counter)
+_pending_requests = 0
+
+
+class RequestProfile:
+    """Замеры одного запроса."""
+
+    def __init__(self):
+        self.db = 0
+        self.template = 0
+        self.queries = 0
+        self.duplicates = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.rendering = False
+        self.seen = set()
+
+    def execute(self, execute, sql, params, many, context):
+        """Обёртка курсора для connection.execute_wrapper."""
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += perf_counter() - start
+            self.queries += 1
+            query = (sql, str(params))
+            if query in self.seen:
+                self.duplicates += 1
+            self.seen.add(query)
+
+    def server_timing(self, wall):
+        """Значение заголовка Server-Timing."""
+        return ', '.join((
+            f'total;dur={wall * 1000:.1f}',
+            f'db;dur={self.db * 1000:.1f};desc="{self.queries} queries, '
+            f'{self.duplicates} duplicates"',
+            f'tpl;dur={self.template * 1000:.1f}',
+            f'cache;desc="{self.cache_hits} hits, '
+            f'{self.cache_misses} misses"',
+        ))
+
+
+def current():
+    return getattr(_local, 'profile', None)
+
+
+def start():
+    _local.profile = RequestProfile()
+    return _local.profile
+
+
+def stop():
+    _local.profile = None
+
+
+def count_cache(hit):
+    """Учитывает чтение из кеша в профиле текущего запроса."""
+    profile = current()
+    if profile is None:
+        return
+    if hit:
+        profile.cache_hits += 1
+    else:
+        profile.cache_misses += 1
+
+
+def _timed_render(render):
+    @wraps(render)
+    def wrapper(self, context):
+        profile = current()
+        # Вложенные шаблоны (include) уже учтены внешним.
+        if profile is None or profile.rendering:
+            return render(self, context)
+        profile.rendering = True
+        start = perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            profile.template += perf_counter() - start
+            profile.rendering = False
+    wrapper.timed = True
+    return wrapper
+
+
+def instrument_templates():
+    """Включает замер рендеринга шаблонов; повторный вызов безвреден."""
+    if not getattr(Template.render, 'timed', False):
+        Template.render = _timed_render(Template.render)
+
+
+def bucket(wall):
+    milliseconds = wall * 1000
+    for limit in BUCKETS:
+        if milliseconds <= limit:
+            return f'le_{limit}'
+    return 'le_inf'
+
+
+def record(view, profile, wall):
+    """Добавляет запрос к итогам view в памяти процесса."""
+    global _pending_requests
+    with _lock:
+        stats = _pending[view]
+        stats['requests'] += 1
+        stats['wall_us'] += int(wall * 10 ** 6)
+        stats['db_us'] += int(profile.db * 10 ** 6)
+        stats['template_us'] += int(profile.template * 10 ** 6)
+        stats['queries'] += profile.queries
+        stats['duplicates'] += profile.duplicates
+        stats['cache_hits'] += profile.cache_hits
+        stats['cache_misses'] += profile.cache_misses
+        stats[bucket(wall)] += 1
+        _pending_requests += 1
+        if _pending_requests < FLUSH_EVERY:
+            return
+    flush()
+
+
+def _key(view, field):
+    return f'{PREFIX}:{view}:{field}'
+
+
+def flush():
+    """Сбрасывает накопленные итоги процесса в кеш."""
+    global _pending, _pending_requests
+    with _lock:
+        pending, _pending = _pending, defaultdict(Counter)
+        _pending_requests = 0
+    if not pending:
+        return
+    views = set(cache.get(VIEWS_KEY, ()))
+    for view, stats in pending.items():
+        views.add(view)
+        for field, value in stats.items():
+            if value and not cache.add(_key(view, field), value, None):
+                cache.incr(_key(view, field), value)
+    cache.set(VIEWS_KEY, sorted(views), None)
+
+
+def load():
+    """Итоги {view: Counter} со всех процессов."""
+    views = cache.get(VIEWS_KEY, ())
+    values = cache.get_many(
+        [_key(view, field) for view in views for field in FIELDS]
+    )
+    return {
+        view: Counter({
+            field: values.get(_key(view, field), 0) for field in FIELDS
+        })
+        for view in views
+    }
+
+
+def reset():
+    views = cache.get(VIEWS_KEY, ())
+    cache.delete_many(
+        [_key(view, field) for view in views for field in FIELDS]
+        + [VIEWS_KEY]
+    )
+
+
+def percentile(stats, share):
+    """Верхняя граница корзины, в которую попал перцентиль, мс."""
+    rank = stats['requests'] * share
+    seen = 0
+    for limit in BUCKETS + ('inf',):
+        seen += stats[f'le_{limit}']
+        if seen >= rank:
+            return float(limit)
+    return float('inf')
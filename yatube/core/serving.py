@@ -0,0 +1,171 @@
+"""
+Отдача статики и загруженных файлов в продакшене.
+
+serve_file проверяет путь и условные заголовки и ставит
+Cache-Control, а сами байты отдаёт веб-сервер: при
+SENDFILE_BACKEND='nginx' ответ пустой с X-Accel-Redirect на
+internal-location, при 'xsendfile' (Apache, lighttpd) — с X-Sendfile и
+путём на диске. Range и сжатые копии веб-сервер тогда обрабатывает
+сам. Без бэкенда (разработка, тесты) файл отдаёт Django: с одним
+диапазоном Range и сжатой копией из collectstatic по Accept-Encoding.
+"""
+import mimetypes
+import os
+import posixpath
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseNotModified,
+    StreamingHttpResponse,
+)
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from .staticfiles import encoders
+from .storage import CHUNK_SIZE, immutable_headers
+
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def resolve(root, path):
+    path = posixpath.normpath(path).lstrip('/')
+    try:
+        fullpath = safe_join(root, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(fullpath):
+        raise Http404
+    return path, fullpath
+
+
+def cache_headers(response, immutable):
+    if immutable:
+        return immutable_headers(response)
+    response['Cache-Control'] = f'public, max-age={settings.FILES_MAX_AGE}'
+    return response
+
+
+def accepted_encodings(request):
+    return {
+        part.split(';')[0].strip()
+        for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(',')
+    }
+
+
+def precompressed(request, fullpath):
+    """Сжатая копия файла, которую примет клиент: (кодировка, путь)."""
+    accepted = accepted_encodings(request)
+    for encoding, suffix, _ in encoders():
+        if encoding in accepted and os.path.isfile(fullpath + suffix):
+            return encoding, fullpath + suffix
+    return None, fullpath
+
+
+def byte_range(request, size, last_modified):
+    """
+    (начало, конец) запрошенного диапазона включительно, None — весь
+    файл. Несколько диапазонов не поддерживаются: отдаётся весь файл.
+    Диапазон за пределами файла — ValueError.
+    """
+    header = request.META.get('HTTP_RANGE', '')
+    match = RANGE.match(header.replace(' ', ''))
+    if match is None:
+        return None
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range and if_range != last_modified:
+        # Файл изменился с тех пор, как клиент получил начало.
+        return None
+    start, end = match.groups()
+    if not start:
+        if not end or not int(end):
+            raise ValueError(header)
+        return max(size - int(end), 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def read_range(fullpath, start, end):
+    with open(fullpath, 'rb') as file:
+        file.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = file.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def sendfile_response(url, fullpath, content_type):
+    response = HttpResponse(content_type=content_type)
+    if settings.SENDFILE_BACKEND == 'nginx':
+        response['X-Accel-Redirect'] = settings.SENDFILE_URL + url
+    else:
+        response['X-Sendfile'] = fullpath
+    return response
+
+
+def file_response(request, fullpath, content_type, size, last_modified,
+                  compress):
+    try:
+        requested = byte_range(request, size, last_modified)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    if requested is not None:
+        start, end = requested
+        response = StreamingHttpResponse(
+            read_range(fullpath, start, end),
+            status=206,
+            content_type=content_type
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = end - start + 1
+    else:
+        encoding, source = (
+            precompressed(request, fullpath) if compress
+            else (None, fullpath)
+        )
+        response = FileResponse(open(source, 'rb'), content_type=content_type)
+        if encoding:
+            response['Content-Encoding'] = encoding
+    if compress:
+        response['Vary'] = 'Accept-Encoding'
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def serve_file(request, root, url, path, immutable=False, compress=False):
+    """
+    Отдаёт файл path из каталога root, опубликованного по адресу url.
+    compress — выбирать сжатую копию файла по Accept-Encoding.
+    """
+    path, fullpath = resolve(root, path)
+    stat = os.stat(fullpath)
+    if not was_modified_since(
+        request.META.get('HTTP_IF_MODIFIED_SINCE'),
+        stat.st_mtime, stat.st_size
+    ):
+        return cache_headers(HttpResponseNotModified(), immutable)
+    content_type = (
+        mimetypes.guess_type(fullpath)[0] or 'application/octet-stream'
+    )
+    last_modified = http_date(stat.st_mtime)
+    if settings.SENDFILE_BACKEND:
+        response = sendfile_response(url + path, fullpath, content_type)
+    else:
+        response = file_response(
+            request, fullpath, content_type, stat.st_size, last_modified,
+            compress
+        )
+    if response.status_code == 416:
+        return response
+    response['Last-Modified'] = last_modified
+    return cache_headers(response, immutable)
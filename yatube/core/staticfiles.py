@@ -0,0 +1,83 @@
+"""
+Статика для продакшена.
+
+collectstatic с CompressedManifestStaticFilesStorage дописывает к
+имени файла хеш содержимого (css/bootstrap.min.<хеш>.css) и кладёт
+рядом сжатые копии: .gz всегда, .br — если установлен пакет brotli.
+Сжимается всё один раз при сборке, а не на каждый запрос; файлы с
+хешем в имени кешируются навсегда.
+"""
+import gzip
+import os
+import re
+from io import BytesIO
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = (
+    '.css', '.js', '.map', '.json', '.svg', '.txt', '.html', '.xml', '.ico',
+)
+# Заголовки ответа съедят выигрыш на совсем маленьких файлах.
+MIN_SIZE = 256
+# Сжатая копия не нужна, если экономит меньше 5%.
+MAX_RATIO = 0.95
+MANIFEST_HASHED_NAME = re.compile(r'\.[0-9a-f]{12}\.\w+$')
+
+
+def is_manifest_hashed(name):
+    return bool(MANIFEST_HASHED_NAME.search(name))
+
+
+def gzip_compress(data):
+    buffer = BytesIO()
+    # mtime=0: одинаковые файлы дают одинаковый архив при каждой сборке.
+    with gzip.GzipFile(
+        fileobj=buffer, mode='wb', compresslevel=9, mtime=0
+    ) as archive:
+        archive.write(data)
+    return buffer.getvalue()
+
+
+def encoders():
+    """Пары (Content-Encoding, суффикс, функция) в порядке предпочтения."""
+    if brotli is not None:
+        yield 'br', '.br', brotli.compress
+    yield 'gzip', '.gz', gzip_compress
+
+
+def compress(path):
+    """Пишет сжатые копии файла рядом с ним; возвращает их пути."""
+    if not path.endswith(COMPRESSIBLE):
+        return []
+    with open(path, 'rb') as source:
+        data = source.read()
+    if len(data) < MIN_SIZE:
+        return []
+    stat = os.stat(path)
+    written = []
+    for _, suffix, encode in encoders():
+        compressed = encode(data)
+        if len(compressed) > len(data) * MAX_RATIO:
+            continue
+        with open(path + suffix, 'wb') as target:
+            target.write(compressed)
+        # Last-Modified копии совпадает с исходным файлом.
+        os.utime(path + suffix, (stat.st_atime, stat.st_mtime))
+        written.append(path + suffix)
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = set(paths) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if self.exists(name):
+                compress(self.path(name))
@@ -0,0 +1,89 @@
+"""
+Хранилище файлов с именами по содержимому.
+
+Файл сохраняется как <каталог>/<ab>/<sha256>.<расширение>, где ab —
+первые символы хеша. Одинаковые файлы получают одно имя и лежат на
+диске один раз, а содержимое по имени никогда не меняется — такие
+ответы можно кешировать навсегда (immutable_headers).
+
+Один файл может принадлежать нескольким записям, поэтому удалять его
+можно, только когда ссылок не осталось: этим занимается gc_media.
+"""
+import hashlib
+import os
+import posixpath
+import re
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+CHUNK_SIZE = 64 * 2 ** 10
+HASHED_NAME = re.compile(r'(^|/)([0-9a-f]{2})/\2[0-9a-f]{62}\.\w+$')
+# Год — наибольший срок, который соблюдают браузеры и CDN.
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def content_hash(content):
+    digest = hashlib.sha256()
+    # File.chunks сам перематывает файл в начало.
+    for chunk in content.chunks(CHUNK_SIZE):
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+def is_hashed(name):
+    return bool(HASHED_NAME.search(name))
+
+
+def immutable_headers(response):
+    """Разрешает кешировать ответ с файлом по хешу навсегда."""
+    response['Cache-Control'] = (
+        f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    )
+    return response
+
+
+@deconstructible
+class HashedFileSystemStorage(FileSystemStorage):
+    def hashed_name(self, name, content):
+        directory, filename = posixpath.split(name.replace('\\', '/'))
+        extension = posixpath.splitext(filename)[1].lower()
+        digest = content_hash(content)
+        return posixpath.join(directory, digest[:2], digest + extension)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(name, content)
+        if self.touch(name):
+            # Такой файл уже есть: второй раз не пишем.
+            return name
+        try:
+            return self._save(name, content)
+        except FileExistsError:
+            # Тот же файл только что записал параллельный запрос.
+            self.touch(name)
+            return name
+
+    def touch(self, name):
+        """
+        Обновляет время изменения файла, если он есть: gc_media не
+        удаляет свежие файлы, а на этот сейчас сошлётся новая запись.
+        """
+        try:
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def get_available_name(self, name, max_length=None):
+        # Имя определяется содержимым, суффиксы для уникальности ему
+        # не нужны. _save спрашивает другое имя, только если файл
+        # появился, пока он писал: тогда сохранять уже нечего.
+        if self.exists(name):
+            raise FileExistsError(name)
+        return name
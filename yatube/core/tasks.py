@@ -0,0 +1,158 @@
+"""
+Очередь фоновых задач в базе данных.
+
+Функция, объявленная через @task, получает метод delay(): он кладёт
+вызов в таблицу Task внутри текущей транзакции, если она открыта, так
+что воркер увидит задачу только вместе с породившей её записью. Воркеры
+команды run_tasks забирают задачи, упавшие повторяют с растущей
+паузой. Задачи с одинаковым ключом в очереди не дублируются, сами
+функции должны быть идемпотентны: после сбоя воркера задачу выполнит
+другой.
+
+С TASKS_EAGER задачи выполняются без очереди и повторов сразу после
+коммита транзакции, в которой вызван delay(), или сразу, если её нет:
+так работают разработка и тесты. Упавшая задача только пишется в лог,
+как и в очереди, и не откатывает породившую её запись.
+"""
+import json
+import logging
+from datetime import timedelta
+from functools import wraps
+from time import perf_counter, sleep
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+
+def task(max_attempts=5):
+    """Объявляет функцию задачей очереди."""
+    def decorator(func):
+        name = f'{func.__module__}.{func.__name__}'
+
+        @wraps(func)
+        def delay(*args, key=None, countdown=0):
+            if settings.TASKS_EAGER:
+                transaction.on_commit(lambda: run_eager(name, func, args))
+                return None
+            return enqueue(name, args, key, countdown, max_attempts)
+
+        func.delay = delay
+        return func
+    return decorator
+
+
+def run_eager(name, func, args):
+    try:
+        func(*args)
+    except Exception:
+        logger.exception('Задача %s%r упала', name, tuple(args))
+
+
+def enqueue(name, args, key=None, countdown=0, max_attempts=5):
+    """Добавляет задачу; если задача с ключом уже ждёт, возвращает её."""
+    if key is not None:
+        waiting = Task.objects.filter(key=key, status=Task.PENDING).first()
+        if waiting is not None:
+            return waiting
+    try:
+        with transaction.atomic():
+            return Task.objects.create(
+                name=name,
+                args=json.dumps(list(args)),
+                key=key,
+                max_attempts=max_attempts,
+                run_at=timezone.now() + timedelta(seconds=countdown),
+            )
+    except IntegrityError:
+        # Ту же задачу успел поставить параллельный запрос.
+        return Task.objects.filter(key=key, status=Task.PENDING).first()
+
+
+def claim(limit):
+    """Забирает до limit готовых задач, в том числе брошенные воркерами."""
+    now = timezone.now()
+    ready = Task.objects.filter(
+        Q(status=Task.PENDING, run_at__lte=now)
+        | Q(status=Task.RUNNING, locked_until__lt=now)
+    ).order_by('run_at', 'pk')
+    claimed = []
+    for task in ready[:limit]:
+        # Условие на состояние не даёт двум воркерам взять одну задачу.
+        taken = Task.objects.filter(
+            pk=task.pk, status=task.status, attempts=task.attempts
+        ).update(
+            status=Task.RUNNING,
+            attempts=F('attempts') + 1,
+            started=now,
+            locked_until=now + timedelta(seconds=settings.TASKS_LEASE),
+        )
+        if taken:
+            claimed.append(task.pk)
+    return claimed
+
+
+def execute(task_id):
+    task = Task.objects.get(pk=task_id)
+    start = perf_counter()
+    try:
+        import_string(task.name)(*json.loads(task.args))
+    except Exception as error:
+        logger.exception('Задача %s упала', task)
+        failed = Task.objects.filter(pk=task_id)
+        error = f'{type(error).__name__}: {error}'
+        if task.attempts < task.max_attempts:
+            delay = settings.TASKS_RETRY_DELAY * 2 ** (task.attempts - 1)
+            try:
+                with transaction.atomic():
+                    failed.update(
+                        status=Task.PENDING,
+                        run_at=timezone.now() + timedelta(seconds=delay),
+                        locked_until=None,
+                        error=error,
+                    )
+                return False
+            except IntegrityError:
+                # Пока задача шла, встала такая же: повторит она.
+                error += ' (повтор передан задаче с тем же ключом)'
+        failed.update(
+            status=Task.FAILED,
+            locked_until=None,
+            finished=timezone.now(),
+            error=error,
+        )
+        return False
+    Task.objects.filter(pk=task_id).update(
+        status=Task.DONE,
+        locked_until=None,
+        finished=timezone.now(),
+        duration=(perf_counter() - start) * 1000,
+    )
+    return True
+
+
+def run_pending(batch=10):
+    """Выполняет задачи, пока очередь не опустеет; возвращает их число."""
+    done = 0
+    while True:
+        claimed = claim(batch)
+        if not claimed:
+            return done
+        for task_id in claimed:
+            execute(task_id)
+        done += len(claimed)
+
+
+def work(poll=1.0, once=False, batch=10):
+    """Цикл воркера: выполняет задачи и ждёт новых."""
+    while True:
+        run_pending(batch)
+        if once:
+            return
+        sleep(poll)
@@ -0,0 +1,87 @@
+"""
+Профиль рендеринга шаблонов: время каждого шаблона, в том числе
+подключённых через {% include %}, и каждого тега.
+
+Собственное время — без вложенных шаблонов и тегов: оно и показывает,
+где тратится рендеринг. Замер подменяет Template._render (его же
+вызывает {% extends %} для базового шаблона) и
+Node.render_annotated только внутри with TemplateProfiler() и
+заметно замедляет рендеринг, поэтому годится для команды
+profile_templates, а не для рабочих запросов.
+"""
+from collections import defaultdict
+from time import perf_counter
+
+from django.template.base import Node, Template, TokenType
+
+
+class Timing:
+    __slots__ = ('calls', 'total', 'own')
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.own = 0.0
+
+
+class TemplateProfiler:
+    def __init__(self):
+        self.timings = defaultdict(Timing)
+        # Время вложенных замеров для каждого открытого уровня.
+        self._stack = []
+
+    def _measure(self, key, render, *args):
+        self._stack.append(0.0)
+        start = perf_counter()
+        try:
+            return render(*args)
+        finally:
+            elapsed = perf_counter() - start
+            nested = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            timing = self.timings[key]
+            timing.calls += 1
+            timing.total += elapsed
+            timing.own += elapsed - nested
+
+    def __enter__(self):
+        profiler = self
+        template_render = self._template_render = Template._render
+        node_render = self._node_render = Node.render_annotated
+
+        def render(template, context):
+            name = template.origin.template_name or template.origin.name
+            return profiler._measure(
+                ('шаблон', str(name)), template_render, template, context
+            )
+
+        def render_annotated(node, context):
+            token = getattr(node, 'token', None)
+            if token is None or token.token_type != TokenType.BLOCK:
+                return node_render(node, context)
+            bits = token.contents.split()
+            # Подключения различаем по шаблону: их время — загрузка и
+            # разбор, если загрузчик не кеширует шаблоны.
+            tag = ' '.join(bits[:2] if bits[0] == 'include' else bits[:1])
+            tag = f'{{% {tag} %}}'
+            return profiler._measure(('тег', tag), node_render, node, context)
+
+        Template._render = render
+        Node.render_annotated = render_annotated
+        return self
+
+    def __exit__(self, *exc_info):
+        Template._render = self._template_render
+        Node.render_annotated = self._node_render
+
+    def report(self):
+        """Замеры по убыванию собственного времени."""
+        return sorted(
+            (
+                (kind, name, timing)
+                for (kind, name), timing in self.timings.items()
+            ),
+            key=lambda row: row[2].own,
+            reverse=True
+        )
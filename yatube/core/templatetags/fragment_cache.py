@@ -0,0 +1,117 @@
+"""
+Тег {% fragment_cache %} — {% cache %}, устойчивый к наплыву запросов.
+
+    {% load fragment_cache %}
+    {% fragment_cache timeout name var1 var2 version=cache_version %}
+        ...
+    {% endfragment_cache %}
+
+Фрагмент хранится под ключом без версии вместе с версией и временем
+построения. Устаревший фрагмент (истёк срок или сменилась версия)
+перестраивает один запрос, взявший блокировку, а остальные пока
+получают старый: он живёт в кеше ещё FRAGMENT_CACHE_STALE секунд.
+Незадолго до срока фрагмент со случайной вероятностью перестраивается
+заранее, тем раньше, чем дольше он строится, — так истечение не
+совпадает у всех воркеров сразу.
+"""
+from math import log
+from random import random
+from time import perf_counter, time
+
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+
+register = template.Library()
+
+
+def expires_early(expires, delta, beta=None):
+    """
+    Вероятностное раннее истечение (XFetch): чем ближе срок и дольше
+    построение фрагмента, тем вероятнее перестроить его сейчас.
+    """
+    if beta is None:
+        beta = settings.FRAGMENT_CACHE_BETA
+    return time() - delta * beta * log(1 - random()) >= expires
+
+
+def get_or_render(key, version, timeout, render):
+    """
+    Возвращает фрагмент из кеша или строит его через render().
+    timeout=None — без срока, фрагмент меняется только с версией.
+    """
+    entry = cache.get(key)
+    if entry is not None:
+        cached_version, expires, delta, content = entry
+        if cached_version == version and (
+            expires is None or not expires_early(expires, delta)
+        ):
+            return content
+    lock_key = f'{key}:lock'
+    locked = cache.add(lock_key, 1, settings.FRAGMENT_CACHE_LOCK_TIMEOUT)
+    if not locked and entry is not None:
+        return content
+    try:
+        start = perf_counter()
+        content = render()
+        delta = perf_counter() - start
+        expires = None
+        stored_for = None
+        if timeout is not None:
+            expires = time() + timeout
+            stored_for = timeout + settings.FRAGMENT_CACHE_STALE
+        cache.set(key, (version, expires, delta, content), stored_for)
+    finally:
+        if locked:
+            cache.delete(lock_key)
+    return content
+
+
+class FragmentCacheNode(template.Node):
+    def __init__(self, nodelist, timeout, name, vary_on, version):
+        self.nodelist = nodelist
+        self.timeout = timeout
+        self.name = name
+        self.vary_on = vary_on
+        self.version = version
+
+    def render(self, context):
+        timeout = self.timeout.resolve(context)
+        if timeout is not None:
+            try:
+                timeout = int(timeout)
+            except (ValueError, TypeError):
+                raise template.TemplateSyntaxError(
+                    f'fragment_cache: срок {timeout!r} не число'
+                )
+        key = make_template_fragment_key(
+            self.name, [var.resolve(context) for var in self.vary_on]
+        )
+        version = ''
+        if self.version is not None:
+            version = str(self.version.resolve(context))
+        return get_or_render(
+            key, version, timeout, lambda: self.nodelist.render(context)
+        )
+
+
+@register.tag
+def fragment_cache(parser, token):
+    nodelist = parser.parse(('endfragment_cache',))
+    parser.delete_first_token()
+    tokens = token.split_contents()
+    if len(tokens) < 3:
+        raise template.TemplateSyntaxError(
+            f'{tokens[0]}: нужны срок и имя фрагмента'
+        )
+    version = None
+    if tokens[-1].startswith('version='):
+        version = parser.compile_filter(tokens.pop()[len('version='):])
+    return FragmentCacheNode(
+        nodelist,
+        parser.compile_filter(tokens[1]),
+        tokens[2],
+        [parser.compile_filter(token) for token in tokens[3:]],
+        version,
+    )
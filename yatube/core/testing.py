@@ -0,0 +1,112 @@
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+class OnCommitMixin:
+    """
+    Примесь к TestCase: captureOnCommitCallbacks из Django 3.2.
+
+    TestCase не коммитит транзакцию, и колбэки on_commit без неё
+    не выполняются. execute=True выполняет добавленные внутри блока
+    колбэки на выходе из него, включая добавленные ими самими.
+    """
+
+    @classmethod
+    @contextmanager
+    def captureOnCommitCallbacks(cls, *, using=DEFAULT_DB_ALIAS,
+                                 execute=False):
+        callbacks = []
+        connection = connections[using]
+        start = len(connection.run_on_commit)
+        try:
+            yield callbacks
+        finally:
+            while True:
+                count = len(connection.run_on_commit)
+                for _, callback in connection.run_on_commit[start:]:
+                    callbacks.append(callback)
+                    if execute:
+                        callback()
+                if count == len(connection.run_on_commit):
+                    break
+                start = count
+
+
+class QueryBudgetMixin:
+    """
+    Примесь к TestCase: ограничивает число SQL-запросов на страницу.
+
+    При превышении бюджета тест падает с точным числом запросов
+    и их текстом, чтобы N+1 был виден прямо в отчёте CI.
+    """
+
+    def assertQueryBudget(self, url, budget, client=None, using='default'):
+        client = client or self.client
+        with CaptureQueriesContext(connections[using]) as context:
+            response = client.get(url)
+        executed = len(context.captured_queries)
+        if executed > budget:
+            queries = '\n'.join(
+                f'{number}. {query["sql"]}'
+                for number, query in enumerate(context.captured_queries, 1)
+            )
+            self.fail(
+                f'{url}: {executed} запросов при бюджете {budget}\n{queries}'
+            )
+        return response
+
+
+class IndexUsageMixin:
+    """
+    Примесь к TestCase: проверяет по EXPLAIN, что выборки страницы
+    из таблицы идут по индексу, без полного сканирования и сортировки.
+
+    Поддерживаются SQLite и PostgreSQL. На PostgreSQL последовательное
+    сканирование отключается, иначе на маленьких тестовых таблицах
+    планировщик всегда предпочтёт его индексу.
+    """
+
+    def explain(self, connection, sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SET enable_seqscan = off')
+                cursor.execute(f'EXPLAIN {sql}')
+            else:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [str(row[-1]) for row in cursor.fetchall()]
+
+    def is_indexed_plan(self, vendor, plan, table):
+        if vendor == 'postgresql':
+            return not any(
+                'Seq Scan' in line and table in line
+                or line.strip().startswith('Sort')
+                for line in plan
+            )
+        return not any(
+            table in line and 'USING' not in line
+            or 'USE TEMP B-TREE FOR ORDER BY' in line
+            for line in plan
+        )
+
+    def assertViewUsesIndexes(self, url, table, client=None,
+                              using='default'):
+        client = client or self.client
+        connection = connections[using]
+        with CaptureQueriesContext(connection) as context:
+            client.get(url)
+        queries = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and f'FROM "{table}"' in query['sql']
+            and 'ORDER BY' in query['sql']
+        ]
+        self.assertTrue(queries, f'{url}: нет выборок из {table}')
+        for sql in queries:
+            plan = self.explain(connection, sql)
+            if not self.is_indexed_plan(connection.vendor, plan, table):
+                self.fail(
+                    f'{url}: запрос идёт без индекса\n{sql}\n'
+                    + '\n'.join(plan)
+                )
@@ -1,5 +1,38 @@
-from django.test import TestCase
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import cache, caches
+from django.core.cache.backends.db import DatabaseCache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.template import Context, Template
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import resolve
+from django.utils import timezone
+from datetime import timedelta
 from http import HTTPStatus
+from io import StringIO
+from time import time, time_ns
+from unittest import mock
+import os
+import shutil
+import tempfile
+
+from core import profiling, tasks
+from core.cache import bump_version, get_version, last_modified
+from core.db import configure_sqlite
+from core.db_router import ReplicaRouter
+from core.middleware import ReplicaMiddleware
+from core.models import Task
+from core.staticfiles import compress
+from core.tasks import task
+from core.testing import OnCommitMixin
+from core.templatetags.fragment_cache import expires_early
+from posts.models import Post
+
+User = get_user_model()
 
 
 class ViewTestClass(TestCase):
@@ -7,3 +40,505 @@ class ViewTestClass(TestCase):
         response = self.client.get('/nonexist-page/')
         self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
         self.assertTemplateUsed(response, 'core/404.html')
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'core.cache_stats.StatsCache',
+        'WRAPPED': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'stats-test',
+        },
+    }
+})
+class StatsCacheTestClass(TestCase):
+    def test_hits_and_misses_by_prefix(self):
+        stats_cache = caches['default']
+        stats_cache.set('version:posts', 1)
+        stats_cache.get('version:posts')
+        stats_cache.get_many(['version:posts', 'version:users'])
+        stats_cache.get('template.cache.posts.0123abcd')
+        stats_cache.flush(stats_cache.counter)
+        self.assertEqual(
+            stats_cache.stats(),
+            {'version': (2, 1), 'fragment:posts': (0, 1)}
+        )
+
+
+class VersionTestClass(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_bump_increments_version(self):
+        version = int(get_version('scope'))
+        bump_version('scope')
+        bump_version('scope')
+        self.assertEqual(int(get_version('scope')), version + 2)
+
+    def test_evicted_version_is_new(self):
+        """Версия, заведённая после вытеснения, не повторяет прежнюю."""
+        version = get_version('scope')
+        cache.delete('version:scope')
+        bump_version('scope')
+        self.assertNotEqual(get_version('scope'), version)
+
+    def test_last_modified(self):
+        """Время изменения хранится отдельно и не зависит от версии."""
+        first = last_modified('scope')
+        self.assertEqual(last_modified('scope'), first)
+        cache.set('version:scope', time_ns() + 10 ** 15, None)
+        self.assertEqual(last_modified('scope'), first)
+        later = first.timestamp() + 60
+        with mock.patch('core.cache.time.time', return_value=later):
+            bump_version('scope')
+        self.assertEqual(
+            last_modified('other', 'scope'), first + timedelta(seconds=60)
+        )
+
+
+class FragmentCacheTestClass(TestCase):
+    template = Template(
+        '{% load fragment_cache %}'
+        '{% fragment_cache timeout part name version=version %}'
+        '{{ value }}'
+        '{% endfragment_cache %}'
+    )
+
+    def setUp(self):
+        cache.clear()
+
+    def render(self, value, version=1, timeout=60):
+        return self.template.render(Context({
+            'timeout': timeout, 'name': 'a',
+            'version': version, 'value': value,
+        }))
+
+    def lock(self):
+        key = make_template_fragment_key('part', ['a'])
+        cache.add(f'{key}:lock', 1)
+
+    def test_cached_until_version_changes(self):
+        self.assertEqual(self.render('first'), 'first')
+        self.assertEqual(self.render('second'), 'first')
+        self.assertEqual(self.render('second', version=2), 'second')
+
+    def test_stale_fragment_while_locked(self):
+        """Пока фрагмент перестраивает другой запрос, отдаётся старый."""
+        self.render('first')
+        self.lock()
+        self.assertEqual(self.render('second', version=2), 'first')
+        self.assertEqual(self.render('second', timeout=-1), 'first')
+
+    def test_renders_without_stale_copy(self):
+        self.lock()
+        self.assertEqual(self.render('first'), 'first')
+
+    @override_settings(FRAGMENT_CACHE_BETA=1.0)
+    def test_early_expiration(self):
+        self.render('first', timeout=0)
+        self.assertEqual(self.render('second'), 'second')
+        now = time()
+        self.assertTrue(expires_early(now, delta=0))
+        self.assertFalse(expires_early(now + 3600, delta=0.01))
+        self.assertFalse(expires_early(now + 1, delta=0.1, beta=0))
+
+
+@override_settings(PROFILING=True, CACHES={
+    'default': {
+        'BACKEND': 'core.cache_stats.StatsCache',
+        'WRAPPED': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'profiling-test',
+        },
+    }
+})
+class ProfilingTestClass(TestCase):
+    def setUp(self):
+        # Итоги прошлых тестов в памяти процесса не должны попасть в замер.
+        profiling.flush()
+        caches['default'].clear()
+
+    def test_server_timing(self):
+        self.client.get('/')
+        response = self.client.get('/')
+        timing = response['Server-Timing']
+        for metric in ('total;dur=', 'db;dur=', 'tpl;dur=', 'cache;desc='):
+            with self.subTest(metric=metric):
+                self.assertIn(metric, timing)
+        self.assertRegex(timing, r'cache;desc="[1-9]\d* hits')
+
+    def test_stats_by_view(self):
+        self.client.get('/')
+        self.client.get('/')
+        self.client.get('/search/')
+        profiling.flush()
+        stats = profiling.load()
+        self.assertEqual(stats['posts:index']['requests'], 2)
+        self.assertEqual(stats['posts:search']['requests'], 1)
+        self.assertGreater(stats['posts:index']['template_us'], 0)
+        output = StringIO()
+        call_command('profiling_stats', stdout=output)
+        self.assertIn('posts:index', output.getvalue())
+        call_command('profiling_stats', reset=True, stdout=StringIO())
+        self.assertEqual(profiling.load(), {})
+
+    def test_duplicate_queries(self):
+        profile = profiling.RequestProfile()
+        with connection.execute_wrapper(profile.execute):
+            for _ in range(3):
+                Post.objects.filter(pk=1).exists()
+            Post.objects.filter(pk=2).exists()
+        self.assertEqual(profile.queries, 4)
+        self.assertEqual(profile.duplicates, 2)
+
+    @override_settings(PROFILING=False)
+    def test_disabled(self):
+        response = self.client.get('/')
+        self.assertNotIn('Server-Timing', response)
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTestClass(TestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        # Модель таблицы кеша заводит сам бэкенд.
+        self.cache_entry = DatabaseCache('cache', {}).cache_model_class
+
+    def request(self, path, method='get', write=False, cookies=None):
+        """Прогоняет запрос через ReplicaMiddleware; view читает Post."""
+        request = getattr(RequestFactory(), method)(path)
+        request.COOKIES.update(cookies or {})
+        request.resolver_match = resolve(path)
+
+        def view(request):
+            middleware.process_view(request, None, (), {})
+            if write:
+                self.router.db_for_write(Post)
+            return HttpResponse(self.router.db_for_read(Post))
+
+        middleware = ReplicaMiddleware(view)
+        return middleware(request)
+
+    def test_read_views_use_replica(self):
+        for path in ('/', '/group/slug/', '/posts/1/', '/about/author/'):
+            with self.subTest(path=path):
+                self.assertEqual(self.request(path).content, b'replica')
+
+    def test_writes_use_primary(self):
+        for path, method in (
+            ('/create/', 'get'),
+            ('/posts/1/comment/', 'post'),
+            ('/', 'post'),
+        ):
+            with self.subTest(path=path, method=method):
+                response = self.request(path, method)
+                self.assertEqual(response.content, b'default')
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    def test_sessions_and_cache_use_primary(self):
+        for model in (Session, self.cache_entry):
+            with self.subTest(model=model):
+                request = RequestFactory().get('/')
+                request.resolver_match = resolve('/')
+
+                def view(request):
+                    middleware.process_view(request, None, (), {})
+                    return HttpResponse(self.router.db_for_read(model))
+
+                middleware = ReplicaMiddleware(view)
+                self.assertEqual(middleware(request).content, b'default')
+
+    def test_cache_writes_do_not_pin(self):
+        request = RequestFactory().get('/')
+        request.resolver_match = resolve('/')
+
+        def view(request):
+            middleware.process_view(request, None, (), {})
+            self.router.db_for_write(self.cache_entry)
+            return HttpResponse(self.router.db_for_read(Post))
+
+        middleware = ReplicaMiddleware(view)
+        response = middleware(request)
+        self.assertEqual(response.content, b'replica')
+        self.assertNotIn(settings.REPLICA_PIN_COOKIE, response.cookies)
+
+    @override_settings(DATABASE_REPLICAS=['replica', 'other'])
+    def test_one_replica_per_request(self):
+        request = RequestFactory().get('/')
+        request.resolver_match = resolve('/')
+
+        def view(request):
+            middleware.process_view(request, None, (), {})
+            return HttpResponse(
+                {self.router.db_for_read(Post) for _ in range(20)}
+            )
+
+        middleware = ReplicaMiddleware(view)
+        for _ in range(5):
+            self.assertIn(middleware(request).content, (b'replica', b'other'))
+
+    def test_read_your_writes(self):
+        response = self.request('/profile/author/follow/', write=True)
+        self.assertEqual(response.content, b'default')
+        cookie = response.cookies[settings.REPLICA_PIN_COOKIE]
+        self.assertEqual(
+            cookie['max-age'], settings.REPLICA_STICKY_SECONDS
+        )
+        response = self.request('/', cookies={cookie.key: cookie.value})
+        self.assertEqual(response.content, b'default')
+        response = self.request('/', write=True)
+        self.assertEqual(response.content, b'default')
+        self.assertIn(settings.REPLICA_PIN_COOKIE, response.cookies)
+
+
+class DatabaseSettingsTestClass(TestCase):
+    @override_settings(SQLITE_PRAGMAS={'cache_size': -1024})
+    def test_sqlite_pragmas(self):
+        configure_sqlite(sender=None, connection=connection)
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(cursor.fetchone()[0], -1024)
+
+    def test_bench_sqlite(self):
+        output = StringIO()
+        call_command(
+            'bench_sqlite', seconds=0.2, rows=100, readers=1, writers=1,
+            stdout=output
+        )
+        self.assertIn('production', output.getvalue())
+
+
+class TemplateProfilerTestClass(TestCase):
+    def test_production_templates_are_cached(self):
+        from yatube import settings_production
+        engine = settings_production.TEMPLATES[0]
+        self.assertFalse(engine['APP_DIRS'])
+        self.assertEqual(
+            engine['OPTIONS']['loaders'][0][0],
+            'django.template.loaders.cached.Loader'
+        )
+
+    def test_profile_templates(self):
+        author = User.objects.create_user(username='author')
+        Post.objects.create(author=author, text='Пост')
+        render = Template._render
+        output = StringIO()
+        call_command('profile_templates', '/', repeat=2, stdout=output)
+        self.assertIn('includes/card.html', output.getvalue())
+        self.assertIn(
+            "{% include 'includes/card.html' %}", output.getvalue()
+        )
+        self.assertIs(Template._render, render)
+
+
+STATIC_FILE = 'css/main.0123456789ab.css'
+
+
+class FileServingTestClass(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.root = tempfile.mkdtemp()
+        cls.content = b'body { color: black; }\n' * 100
+        path = os.path.join(cls.root, STATIC_FILE)
+        os.makedirs(os.path.dirname(path))
+        with open(path, 'wb') as file:
+            file.write(cls.content)
+        cls.compressed = compress(path)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(cls.root, ignore_errors=True)
+
+    def get(self, name=STATIC_FILE, **headers):
+        with self.settings(STATIC_ROOT=self.root, SENDFILE_BACKEND=''):
+            return self.client.get(settings.STATIC_URL + name, **headers)
+
+    def test_compress(self):
+        self.assertIn(
+            os.path.join(self.root, STATIC_FILE) + '.gz', self.compressed
+        )
+        small = os.path.join(self.root, 'small.css')
+        with open(small, 'wb') as file:
+            file.write(b'a{}')
+        self.assertEqual(compress(small), [])
+
+    def test_precompressed(self):
+        response = self.get(HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertLess(
+            int(response['Content-Length']), len(self.content)
+        )
+        response = self.get()
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+
+    def test_unhashed_name_is_cached_briefly(self):
+        response = self.get('small.css')
+        self.assertEqual(
+            response['Cache-Control'],
+            f'public, max-age={settings.FILES_MAX_AGE}'
+        )
+
+    def test_range(self):
+        response = self.get(HTTP_RANGE='bytes=5-9')
+        self.assertEqual(response.status_code, HTTPStatus.PARTIAL_CONTENT)
+        self.assertEqual(
+            response['Content-Range'], f'bytes 5-9/{len(self.content)}'
+        )
+        self.assertEqual(b''.join(response.streaming_content), b'{ col')
+        response = self.get(HTTP_RANGE='bytes=-3')
+        self.assertEqual(b''.join(response.streaming_content), b' }\n')
+        response = self.get(HTTP_RANGE=f'bytes={len(self.content)}-')
+        self.assertEqual(
+            response.status_code, HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+        )
+        response = self.get(
+            HTTP_RANGE='bytes=5-9',
+            HTTP_IF_RANGE='Thu, 01 Jan 1970 00:00:00 GMT'
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_not_modified(self):
+        response = self.get()
+        response = self.get(HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_outside_root(self):
+        self.assertEqual(
+            self.get('../etc/passwd').status_code, HTTPStatus.NOT_FOUND
+        )
+        self.assertEqual(self.get('css/').status_code, HTTPStatus.NOT_FOUND)
+
+    def test_sendfile(self):
+        url = settings.STATIC_URL + STATIC_FILE
+        with self.settings(STATIC_ROOT=self.root, SENDFILE_BACKEND='nginx'):
+            response = self.client.get(url)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(
+            response['X-Accel-Redirect'], settings.SENDFILE_URL + url[1:]
+        )
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertIn('immutable', response['Cache-Control'])
+        with self.settings(
+            STATIC_ROOT=self.root, SENDFILE_BACKEND='xsendfile'
+        ):
+            response = self.client.get(url)
+        self.assertEqual(
+            response['X-Sendfile'], os.path.join(self.root, STATIC_FILE)
+        )
+
+    def test_production_storage(self):
+        from yatube import settings_production
+        self.assertEqual(
+            settings_production.STATICFILES_STORAGE,
+            'core.staticfiles.CompressedManifestStaticFilesStorage'
+        )
+
+
+CALLS = []
+
+
+@task(max_attempts=2)
+def record_call(value):
+    CALLS.append(value)
+
+
+@task(max_attempts=2)
+def fail_always():
+    raise ValueError('сбой')
+
+
+@override_settings(TASKS_EAGER=False, TASKS_RETRY_DELAY=0)
+class TaskQueueTestClass(OnCommitMixin, TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_delay_and_run(self):
+        record_call.delay(1)
+        record_call.delay(2)
+        self.assertEqual(CALLS, [])
+        self.assertEqual(tasks.run_pending(), 2)
+        self.assertEqual(CALLS, [1, 2])
+        self.assertEqual(
+            Task.objects.filter(status=Task.DONE).count(), 2
+        )
+
+    def test_key_deduplicates_pending(self):
+        first = record_call.delay(1, key='once')
+        self.assertEqual(record_call.delay(1, key='once'), first)
+        tasks.run_pending()
+        record_call.delay(1, key='once')
+        tasks.run_pending()
+        self.assertEqual(CALLS, [1, 1])
+
+    def test_retry_then_fail(self):
+        task = fail_always.delay()
+        tasks.run_pending()
+        task.refresh_from_db()
+        self.assertEqual(task.status, Task.FAILED)
+        self.assertEqual(task.attempts, 2)
+        self.assertIn('ValueError', task.error)
+
+    def test_retry_with_pending_duplicate(self):
+        task = fail_always.delay(key='duplicate')
+        tasks.claim(1)
+        fail_always.delay(key='duplicate')
+        tasks.execute(task.pk)
+        task.refresh_from_db()
+        self.assertEqual(task.status, Task.FAILED)
+        self.assertEqual(
+            Task.objects.filter(status=Task.PENDING).count(), 1
+        )
+
+    def test_abandoned_task_is_reclaimed(self):
+        task = record_call.delay(3)
+        Task.objects.filter(pk=task.pk).update(
+            status=Task.RUNNING,
+            locked_until=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertEqual(tasks.claim(10), [task.pk])
+        self.assertEqual(tasks.claim(10), [])
+
+    def test_eager(self):
+        with self.settings(TASKS_EAGER=True):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertIsNone(record_call.delay(4))
+        self.assertEqual(CALLS, [4])
+        self.assertFalse(Task.objects.exists())
+
+    def test_eager_runs_after_commit(self):
+        with self.settings(TASKS_EAGER=True):
+            with self.captureOnCommitCallbacks() as callbacks:
+                with transaction.atomic():
+                    record_call.delay(4)
+            self.assertEqual(CALLS, [])
+            for callback in callbacks:
+                callback()
+        self.assertEqual(CALLS, [4])
+
+    def test_eager_logs_errors(self):
+        """Ошибка задачи пишется в лог, а не всплывает к вызывающему."""
+        with self.settings(TASKS_EAGER=True):
+            with self.assertLogs('core.tasks', 'ERROR') as logs:
+                with self.captureOnCommitCallbacks(execute=True):
+                    fail_always.delay()
+        self.assertIn('core.tests.fail_always', logs.output[0])
+        self.assertFalse(Task.objects.exists())
+
+    def test_commands(self):
+        record_call.delay(5)
+        fail_always.delay()
+        call_command('run_tasks', once=True, processes=1)
+        output = StringIO()
+        call_command('task_stats', stdout=output)
+        self.assertIn('core.tests.record_call', output.getvalue())
+        self.assertIn('core.tests.fail_always', output.getvalue())
+        call_command('task_stats', purge=0, stdout=StringIO())
+        self.assertEqual(
+            list(Task.objects.values_list('status', flat=True)),
+            [Task.FAILED]
+        )
@@ -0,0 +1,32 @@
+"""
+Приём загружаемых файлов.
+
+LimitedUploadHandler пишет каждый файл сразу во временный файл на
+диске, не держа его в памяти, и бросает файл, как только тот
+превысит FILE_UPLOAD_MAX_SIZE. Имена полей брошенных файлов остаются
+в request.oversized_uploads, чтобы форма показала ошибку.
+"""
+from django.conf import settings
+from django.core.files.uploadhandler import (
+    SkipFile, TemporaryFileUploadHandler,
+)
+
+
+def oversized_uploads(request):
+    """Поля, файлы которых отброшены как слишком большие."""
+    return getattr(request, 'oversized_uploads', set())
+
+
+class LimitedUploadHandler(TemporaryFileUploadHandler):
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.FILE_UPLOAD_MAX_SIZE:
+            if not hasattr(self.request, 'oversized_uploads'):
+                self.request.oversized_uploads = set()
+            self.request.oversized_uploads.add(self.field_name)
+            raise SkipFile
+        return super().receive_data_chunk(raw_data, start)
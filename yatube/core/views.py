@@ -1,5 +1,10 @@
+from django.conf import settings
 from django.shortcuts import render
 
+from .serving import serve_file
+from .staticfiles import is_manifest_hashed
+from .storage import is_hashed
+
 
 def page_not_found(request, exception):
     return render(request, 'core/404.html', {'path': request.path}, status=404)
@@ -15,3 +20,19 @@ def permission_denied(request, exception):
 
 def csrf_failure(request, reason=''):
     return render(request, 'core/403csrf.html')
+
+
+def media(request, path):
+    """Отдаёт загруженные файлы; файлы с именем по хешу — навсегда."""
+    return serve_file(
+        request, settings.MEDIA_ROOT, settings.MEDIA_URL.lstrip('/'), path,
+        immutable=is_hashed(path)
+    )
+
+
+def static(request, path):
+    """Отдаёт собранную collectstatic статику со сжатыми копиями."""
+    return serve_file(
+        request, settings.STATIC_ROOT, settings.STATIC_URL.lstrip('/'), path,
+        immutable=is_manifest_hashed(path), compress=True
+    )
@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Comment, Follow, Post, UserStats
+
+User = get_user_model()
+
+
+def _count(queryset, field):
+    """Коррелированный подзапрос COUNT(*) по полю field = OuterRef('pk')."""
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef('pk')}).order_by().values(
+                field
+            ).annotate(count=Count('pk')).values('count')
+        ),
+        Value(0)
+    )
+
+
+def reconcile_users(users):
+    """Пересчитывает счётчики пользователей по исходным таблицам."""
+    missing = users.filter(stats__isnull=True).values_list('pk', flat=True)
+    UserStats.objects.bulk_create(
+        (UserStats(user_id=pk) for pk in missing),
+        batch_size=1000,
+        ignore_conflicts=True
+    )
+    return UserStats.objects.filter(user__in=users).update(
+        posts_count=_count(Post.objects.all(), 'author'),
+        followers_count=_count(Follow.objects.all(), 'author'),
+        following_count=_count(Follow.objects.all(), 'user'),
+    )
+
+
+def reconcile_posts(posts):
+    """Пересчитывает количество комментариев у постов."""
+    return posts.update(comments_count=_count(Comment.objects.all(), 'post'))
+
+
+def change_user_stats(user_id, create=False, **deltas):
+    """
+    Сдвигает счётчики пользователя атомарным UPDATE ... SET x = x + n.
+
+    Строки счётчиков может не оказаться (пользователь заведён до их
+    появления): при создании объектов она пересчитывается с нуля,
+    а при удалении не создаётся, чтобы не мешать каскадному удалению.
+    """
+    updated = UserStats.objects.filter(user_id=user_id).update(**{
+        field: F(field) + delta for field, delta in deltas.items()
+    })
+    if not updated and create:
+        reconcile_users(User.objects.filter(pk=user_id))
+
+
+def change_comments_count(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comments_count=F('comments_count') + delta
+    )
+
+
+def user_stats(user):
+    """Счётчики пользователя; недостающая строка пересчитывается."""
+    try:
+        return user.stats
+    except UserStats.DoesNotExist:
+        reconcile_users(User.objects.filter(pk=user.pk))
+        return UserStats.objects.get(user=user)
@@ -0,0 +1,138 @@
+from itertools import islice
+
+from django.conf import settings
+from django.db.models import F, Q
+
+from .models import FeedEntry, Follow, Post, UserStats
+
+# Поля ключа курсорной пагинации, которые аннотирует follow_feed.
+FEED_KEYS = ('feed_created', 'feed_post')
+
+
+def is_heavy_author(author_id):
+    """Автор, чьи посты не раскладываются по лентам при записи."""
+    return UserStats.objects.filter(
+        user=author_id,
+        followers_count__gt=settings.FEED_FANOUT_FOLLOWERS_LIMIT
+    ).exists()
+
+
+def became_light(author_id):
+    """
+    После отписки у автора подписчиков ровно столько, сколько в пороге:
+    он только что перестал быть «тяжёлым». Счётчик сдвигается на
+    единицу под блокировкой строки, поэтому это видит одна отписка.
+    """
+    return settings.FEED_FANOUT and UserStats.objects.filter(
+        user=author_id,
+        followers_count=settings.FEED_FANOUT_FOLLOWERS_LIMIT
+    ).exists()
+
+
+def heavy_authors(user):
+    """Id авторов из подписок пользователя, читаемых при чтении ленты."""
+    return list(
+        Follow.objects.filter(
+            user=user,
+            author__stats__followers_count__gt=(
+                settings.FEED_FANOUT_FOLLOWERS_LIMIT
+            )
+        ).values_list('author', flat=True)
+    )
+
+
+def _push(entries):
+    entries = iter(entries)
+    batch = list(islice(entries, settings.FEED_FANOUT_BATCH_SIZE))
+    while batch:
+        FeedEntry.objects.bulk_create(batch, ignore_conflicts=True)
+        batch = list(islice(entries, settings.FEED_FANOUT_BATCH_SIZE))
+
+
+def fan_out(post):
+    """Раскладывает новый пост по лентам подписчиков автора."""
+    if not settings.FEED_FANOUT or is_heavy_author(post.author_id):
+        return
+    followers = Follow.objects.filter(
+        author=post.author_id
+    ).values_list('user', flat=True)
+    _push(
+        FeedEntry(user_id=user_id, post=post, created=post.created)
+        for user_id in followers.iterator()
+    )
+
+
+def backfill(follow):
+    """Добавляет в ленту нового подписчика уже опубликованные посты."""
+    if not settings.FEED_FANOUT or is_heavy_author(follow.author_id):
+        return
+    posts = Post.objects.filter(
+        author=follow.author_id
+    ).values_list('pk', 'created')
+    _push(
+        FeedEntry(user_id=follow.user_id, post_id=post_id, created=created)
+        for post_id, created in posts.iterator()
+    )
+
+
+def backfill_author(author_id):
+    """
+    Раскладывает все посты автора по лентам подписчиков: пока автор
+    был «тяжёлым», его посты в ленты не попадали.
+    """
+    if not settings.FEED_FANOUT or is_heavy_author(author_id):
+        return
+    posts = list(
+        Post.objects.filter(author=author_id).values_list('pk', 'created')
+    )
+    followers = Follow.objects.filter(
+        author=author_id
+    ).values_list('user', flat=True)
+    _push(
+        FeedEntry(user_id=user_id, post_id=post_id, created=created)
+        for user_id in followers.iterator()
+        for post_id, created in posts
+    )
+
+
+def prune(follow):
+    """Убирает из ленты посты автора, от которого отписались."""
+    FeedEntry.objects.filter(
+        user=follow.user_id,
+        post__author=follow.author_id
+    ).delete()
+
+
+def rebuild(user):
+    """Пересобирает ленту пользователя с нуля."""
+    FeedEntry.objects.filter(user=user).delete()
+    for follow in Follow.objects.filter(user=user):
+        backfill(follow)
+
+
+def follow_feed(user):
+    """
+    Посты авторов, на которых подписан пользователь.
+
+    При включённом FEED_FANOUT лента читается из материализованных
+    записей одним проходом по индексу (user, created), а посты
+    «тяжёлых» авторов подмешиваются чтением. Иначе лента целиком
+    собирается при чтении. Листать ленту нужно по ключу FEED_KEYS.
+    """
+    if not settings.FEED_FANOUT:
+        return Post.objects.filter(author__following__user=user).annotate(
+            feed_created=F('created'),
+            feed_post=F('pk')
+        )
+    heavy = heavy_authors(user)
+    if not heavy:
+        return Post.objects.filter(feed_entries__user=user).annotate(
+            feed_created=F('feed_entries__created'),
+            feed_post=F('feed_entries__post')
+        )
+    # Через подзапрос, а не JOIN: записи, разложенные до того, как автор
+    # стал «тяжёлым», не должны дублировать его посты.
+    entries = FeedEntry.objects.filter(user=user).values('post')
+    return Post.objects.filter(
+        Q(pk__in=entries) | Q(author__in=heavy)
+    ).annotate(feed_created=F('created'), feed_post=F('pk'))
@@ -0,0 +1,102 @@
+"""
+Граф подписок.
+
+Множество id авторов, на которых подписан пользователь, хранится в
+кеше массивом 8-байтовых чисел под ключом с версией области
+follow:<id>. Сигналы Follow сдвигают версию при подписке и отписке,
+и множество перечитывается из базы одним запросом. Проверки после
+этого — поиск во frozenset без запросов, а множества нескольких
+пользователей читаются одним get_many.
+
+Подписчиков не кешируем: у популярного автора их слишком много.
+Количества подписок и подписчиков берутся из UserStats.
+"""
+from array import array
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.cache import get_versions
+
+from .counters import user_stats
+from .models import Follow
+
+
+def _pk(user):
+    return getattr(user, 'pk', user)
+
+
+def _key(user_id, version):
+    return f'follow_graph:{user_id}:{version}'
+
+
+def pack(ids):
+    return array('q', sorted(ids)).tobytes()
+
+
+def unpack(data):
+    return frozenset(array('q', data))
+
+
+def following_many(users):
+    """Словарь id пользователя — frozenset id авторов его подписок."""
+    user_ids = list(dict.fromkeys(
+        _pk(user) for user in users if _pk(user) is not None
+    ))
+    if not user_ids:
+        return {}
+    versions = get_versions(*(f'follow:{pk}' for pk in user_ids))
+    keys = {pk: _key(pk, version) for pk, version in zip(user_ids, versions)}
+    cached = cache.get_many(list(keys.values()))
+    result = {
+        pk: unpack(cached[key]) for pk, key in keys.items() if key in cached
+    }
+    missing = {pk: set() for pk in user_ids if pk not in result}
+    if missing:
+        follows = Follow.objects.filter(
+            user__in=list(missing)
+        ).values_list('user', 'author')
+        for user_id, author_id in follows.iterator():
+            missing[user_id].add(author_id)
+        cache.set_many(
+            {keys[pk]: pack(ids) for pk, ids in missing.items()},
+            settings.FOLLOW_GRAPH_TIMEOUT
+        )
+        result.update((pk, frozenset(ids)) for pk, ids in missing.items())
+    return result
+
+
+def following(user):
+    """frozenset id авторов, на которых подписан пользователь."""
+    return following_many([user]).get(_pk(user), frozenset())
+
+
+def is_following(user, authors):
+    """Словарь id автора — подписан ли на него user; одно чтение кеша."""
+    followed = following(user)
+    return {_pk(author): _pk(author) in followed for author in authors}
+
+
+def is_mutual(user, author):
+    graph = following_many([user, author])
+    return (
+        _pk(author) in graph.get(_pk(user), ())
+        and _pk(user) in graph.get(_pk(author), ())
+    )
+
+
+def mutual(user):
+    """frozenset id тех, с кем user подписан друг на друга."""
+    authors = following(user)
+    graph = following_many(authors)
+    return frozenset(
+        author for author in authors if _pk(user) in graph[author]
+    )
+
+
+def followers_count(user):
+    return user_stats(user).followers_count
+
+
+def following_count(user):
+    return user_stats(user).following_count
@@ -1,5 +1,8 @@
 from django import forms
+from django.conf import settings
+from django.template.defaultfilters import filesizeformat
 
+from .images import validate_dimensions
 from .models import Post, Comment
 
 
@@ -23,6 +26,24 @@ class PostForm(forms.ModelForm):
             'image': 'Иллюстрация к посту'
         }
 
+    def __init__(self, *args, oversized=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.oversized = oversized
+
+    def clean_image(self):
+        image = self.cleaned_data['image']
+        # У новой загрузки ImageField оставляет открытую картинку PIL.
+        if getattr(image, 'image', None) is not None:
+            validate_dimensions(image)
+        return image
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if 'image' in self.oversized:
+            limit = filesizeformat(settings.FILE_UPLOAD_MAX_SIZE)
+            self.add_error('image', f'Файл больше {limit}.')
+        return cleaned_data
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
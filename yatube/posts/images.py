@@ -0,0 +1,101 @@
+"""
+Картинки постов: проверка при загрузке и пережатие в фоне.
+
+Форма проверяет размер картинки по заголовку файла, не распаковывая
+её. После сохранения поста задача process_image приводит картинку к
+POST_IMAGE_MAX_SIDE по большей стороне, поворачивает по EXIF и
+сохраняет в POST_IMAGE_FORMAT без метаданных, а затем строит
+миниатюру. Пережимают воркеры run_tasks, каждый в своём процессе.
+"""
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, features
+
+from .models import Post
+from .signals import bump_post_versions
+
+EXTENSIONS = {'WEBP': 'webp', 'JPEG': 'jpg'}
+
+
+def validate_dimensions(image):
+    """
+    Проверяет ширину и высоту загруженной картинки. ImageField уже
+    открыл её: PIL прочитал только заголовок, пиксели не распакованы.
+    """
+    width, height = image.image.size
+    if width * height > settings.POST_IMAGE_MAX_PIXELS:
+        raise ValidationError(
+            f'Картинка {width}×{height} слишком большая: допустимо '
+            f'не больше {settings.POST_IMAGE_MAX_PIXELS // 10 ** 6} Мп.'
+        )
+
+
+def output_format():
+    """POST_IMAGE_FORMAT или JPEG, если Pillow собран без WebP."""
+    if settings.POST_IMAGE_FORMAT == 'WEBP' and not features.check('webp'):
+        return 'JPEG'
+    return settings.POST_IMAGE_FORMAT
+
+
+def reencode(image, image_format):
+    """Пережатая копия картинки без метаданных или None, если не нужна."""
+    max_side = settings.POST_IMAGE_MAX_SIDE
+    if (
+        image.format == image_format
+        and max(image.size) <= max_side
+        and 'exif' not in image.info
+        and 'icc_profile' not in image.info
+    ):
+        return None
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail((max_side, max_side), Image.LANCZOS)
+    if image_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    elif image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if image.mode in ('LA', 'P') else 'RGB')
+    # Метаданные не передаём: save пишет только пиксели.
+    buffer = BytesIO()
+    image.save(
+        buffer, image_format,
+        quality=settings.POST_IMAGE_QUALITY, optimize=True
+    )
+    return buffer.getvalue()
+
+
+def process(post_id):
+    """
+    Заменяет картинку поста пережатой; возвращает True, если заменил.
+    Анимации оставляются как есть.
+    """
+    post = Post.objects.filter(pk=post_id).only(
+        'image', 'author', 'group'
+    ).first()
+    if post is None or not post.image:
+        return False
+    name = post.image.name
+    image_format = output_format()
+    with post.image.open('rb'), Image.open(post.image) as image:
+        if getattr(image, 'is_animated', False):
+            return False
+        content = reencode(image, image_format)
+    if content is None:
+        return False
+    stem = os.path.splitext(os.path.basename(name))[0]
+    new_name = post.image.storage.save(
+        post.image.field.generate_filename(
+            post, f'{stem}.{EXTENSIONS[image_format]}'
+        ),
+        ContentFile(content)
+    )
+    # Картинку могли заменить, пока пережималась старая.
+    updated = Post.objects.filter(pk=post_id, image=name).update(
+        image=new_name, thumbnail=''
+    )
+    if updated:
+        # Старый файл может быть и у других постов: его удалит gc_media.
+        bump_post_versions(post)
+    return bool(updated)
@@ -0,0 +1,69 @@
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.paginator import NEXT, CursorPaginator, encode_cursor
+from posts.models import Post
+from posts.utils import POSTS_PER_PAGE
+
+User = get_user_model()
+BATCH_SIZE = 10000
+DEPTHS = (1, 10, 100, 1000, 10000, 50000, 99999)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает постраничную (OFFSET) и курсорную пагинацию ленты. '
+        'Тестовые посты создаются в транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options['posts'])
+            self.stdout.write(f'{"страница":>10} {"offset, мс":>12} '
+                              f'{"cursor, мс":>12}')
+            last_page = options['posts'] // POSTS_PER_PAGE
+            for depth in DEPTHS:
+                if depth > last_page:
+                    break
+                offset, cursor = self.measure(depth, options['repeat'])
+                self.stdout.write(
+                    f'{depth:>10} {offset * 1000:>12.2f} '
+                    f'{cursor * 1000:>12.2f}'
+                )
+            transaction.set_rollback(True)
+
+    def seed(self, count):
+        author = User.objects.create_user(username='bench_pagination')
+        for start in range(0, count, BATCH_SIZE):
+            Post.objects.bulk_create(
+                Post(author=author, text=f'Пост {number}')
+                for number in range(start, min(start + BATCH_SIZE, count))
+            )
+
+    def measure(self, depth, repeat):
+        posts = Post.objects.all()
+        # Граница предыдущей страницы, по которой строится курсор.
+        cursor = None
+        if depth > 1:
+            boundary = posts.order_by('-created', '-pk')[
+                (depth - 1) * POSTS_PER_PAGE - 1
+            ]
+            cursor = encode_cursor(NEXT, boundary)
+        offset_time = cursor_time = float('inf')
+        for _ in range(repeat):
+            start = perf_counter()
+            list(CursorPaginator(posts, POSTS_PER_PAGE).page(depth))
+            offset_time = min(offset_time, perf_counter() - start)
+            start = perf_counter()
+            list(CursorPaginator(posts, POSTS_PER_PAGE).get_cursor_page(
+                cursor
+            ))
+            cursor_time = min(cursor_time, perf_counter() - start)
+        return offset_time, cursor_time
@@ -0,0 +1,286 @@
+import json
+import platform
+import random
+import subprocess
+import tracemalloc
+from copy import deepcopy
+from datetime import datetime
+from time import perf_counter, time_ns
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import F
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from posts import counters, feed, search
+from posts.models import Comment, Follow, Group, Post
+from posts.urls import urlpatterns
+
+User = get_user_model()
+BATCH_SIZE = 10000
+PREFIX = 'bench_routes'
+
+
+def percentile(values, share):
+    """Перцентиль по ближайшему рангу."""
+    ordered = sorted(values)
+    rank = max(round(share * len(ordered) + 0.5), 1)
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            cwd=settings.BASE_DIR, check=True, universal_newlines=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def isolated_caches():
+    """
+    Настройки кеша с отдельным префиксом ключей: замер идёт на рабочем
+    бэкенде, но не видит чужих фрагментов и не портит их.
+    """
+    caches = deepcopy(settings.CACHES)
+    prefix = f'{PREFIX}:{time_ns()}'
+    for params in caches.values():
+        params['KEY_PREFIX'] = prefix
+        if 'WRAPPED' in params:
+            params['WRAPPED']['KEY_PREFIX'] = prefix
+    return caches
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный замер всех страниц posts: p50/p99 времени ответа, '
+        'число SQL-запросов и пик выделенной памяти на запрос. '
+        'Данные создаются в транзакции и откатываются, результат '
+        'сохраняется в JSON для сравнения между коммитами.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument('--comments', type=int, default=100000)
+        parser.add_argument('--follows', type=int, default=20000)
+        parser.add_argument('--repeat', type=int, default=100)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', default='bench_routes.json')
+        parser.add_argument(
+            '--page-cache', action='store_true',
+            help='Не отключать кеш страниц для анонимов: тогда тёплые '
+                 'запросы к лентам меряют отдачу из кеша.'
+        )
+        parser.add_argument(
+            '--compare',
+            help='JSON прошлого прогона, с которым сравнить результат.'
+        )
+
+    def handle(self, *args, **options):
+        if min(options['users'] - 1, options['groups'], options['posts']) < 1:
+            raise CommandError(
+                'Нужны хотя бы 2 пользователя, 1 группа и 1 пост.'
+            )
+        self.random = random.Random(options['seed'])
+        with override_settings(
+            CACHES=isolated_caches(), PAGE_CACHE=options['page_cache']
+        ):
+            with transaction.atomic():
+                self.seed(options)
+                routes = {
+                    name: self.measure(name, scenario, options)
+                    for name, scenario in self.scenarios().items()
+                }
+                transaction.set_rollback(True)
+        result = {
+            'commit': git_commit(),
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'cache': settings.CACHES['default']['BACKEND'],
+            'page_cache': options['page_cache'],
+            'volumes': {
+                key: options[key]
+                for key in ('users', 'groups', 'posts', 'comments', 'follows')
+            },
+            'repeat': options['repeat'],
+            'routes': routes,
+        }
+        previous = None
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as file:
+                previous = json.load(file)['routes']
+        self.report(routes, previous)
+        with open(options['output'], 'w', encoding='utf-8') as file:
+            json.dump(result, file, ensure_ascii=False, indent=2)
+        self.stdout.write(f'Результат записан в {options["output"]}')
+
+    def bulk_create(self, model, objects, count):
+        for start in range(0, count, BATCH_SIZE):
+            model.objects.bulk_create(
+                (objects(number)
+                 for number in range(start, min(start + BATCH_SIZE, count))),
+                ignore_conflicts=model is Follow
+            )
+
+    def seed(self, options):
+        """
+        Заполняет базу пачками в обход сигналов, затем пересчитывает
+        счётчики, ленты подписок и поисковый индекс.
+        """
+        choice = self.random.choice
+        self.bulk_create(User, lambda number: User(
+            username=f'{PREFIX}_{number}', first_name='Автор',
+            last_name=str(number), password='!'
+        ), options['users'])
+        users = User.objects.filter(username__startswith=f'{PREFIX}_')
+        user_ids = list(users.values_list('pk', flat=True))
+        self.bulk_create(Group, lambda number: Group(
+            title=f'Группа {number}', slug=f'{PREFIX}-{number}',
+            description='Описание'
+        ), options['groups'])
+        group_ids = list(Group.objects.filter(
+            slug__startswith=f'{PREFIX}-'
+        ).values_list('pk', flat=True)) + [None]
+        self.bulk_create(Post, lambda number: Post(
+            author_id=choice(user_ids), group_id=choice(group_ids),
+            text=f'Тестовый пост номер {number}'
+        ), options['posts'])
+        post_ids = list(Post.objects.filter(
+            author__in=user_ids
+        ).values_list('pk', flat=True))
+        self.bulk_create(Comment, lambda number: Comment(
+            author_id=choice(user_ids), post_id=choice(post_ids),
+            text=f'Комментарий {number}'
+        ), options['comments'])
+        # Читатель подписан на всех, кроме автора, на которого
+        # подписывается сценарий profile_follow.
+        self.reader = users.get(pk=user_ids[0])
+        self.author = users.get(pk=user_ids[1])
+
+        def follow(number):
+            if number < len(user_ids):
+                return Follow(user=self.reader, author_id=user_ids[number])
+            return Follow(user_id=choice(user_ids), author_id=choice(user_ids))
+
+        self.bulk_create(Follow, follow, options['follows'])
+        Follow.objects.filter(
+            author__in=[self.reader, self.author], user=self.reader
+        ).delete()
+        Follow.objects.filter(author__in=user_ids, user=F('author')).delete()
+        counters.reconcile_users(users)
+        counters.reconcile_posts(Post.objects.filter(pk__in=post_ids))
+        for user in users.filter(follower__isnull=False).distinct():
+            feed.rebuild(user)
+        search.rebuild_index()
+        self.post = Post.objects.filter(author=self.reader).first() or (
+            Post.objects.create(author=self.reader, text='Пост читателя')
+        )
+        self.group = Group.objects.get(pk=group_ids[0])
+
+    def scenarios(self):
+        """Запросы к каждому маршруту posts: метод, адрес, данные, вход."""
+        post_id = {'post_id': self.post.pk}
+        author = {'username': self.author.username}
+        scenarios = {
+            'index': ('get', {}, None, False),
+            'index_more': ('get', {}, None, False),
+            'group_post': ('get', {'slug': self.group.slug}, None, False),
+            'group_more': ('get', {'slug': self.group.slug}, None, False),
+            'profile': ('get', author, None, False),
+            'profile_more': ('get', author, None, False),
+            'post_detail': ('get', post_id, None, False),
+            'post_comments': ('get', post_id, None, False),
+            'post_create': ('get', {}, None, True),
+            'post_edit': ('get', post_id, None, True),
+            'add_comment': ('post', post_id, {'text': 'Замер'}, True),
+            'follow_index': ('get', {}, None, True),
+            'follow_more': ('get', {}, None, True),
+            'search': ('get', {}, {'q': 'тестовый пост'}, False),
+            'profile_follow': ('get', author, None, True),
+            'profile_unfollow': ('get', author, None, True),
+        }
+        names = [pattern.name for pattern in urlpatterns]
+        for name in names:
+            if name not in scenarios:
+                self.stderr.write(f'Нет сценария замера для {name}')
+        return {
+            name: scenarios[name] for name in names if name in scenarios
+        }
+
+    def measure(self, name, scenario, options):
+        method, kwargs, data, login = scenario
+        client = Client()
+        if login:
+            client.force_login(self.reader)
+        url = reverse(f'posts:{name}', kwargs=kwargs)
+
+        def request():
+            return getattr(client, method)(url, data)
+
+        start = perf_counter()
+        response = request()
+        cold = perf_counter() - start
+        for _ in range(options['warmup']):
+            request()
+        timings = []
+        for _ in range(options['repeat']):
+            start = perf_counter()
+            request()
+            timings.append(perf_counter() - start)
+        # Журнал connection.queries очищается в начале каждого запроса,
+        # поэтому запросы к базе считаем обёрткой курсора.
+        queries = []
+        with connection.execute_wrapper(
+            lambda execute, sql, *args: queries.append(sql) or execute(
+                sql, *args
+            )
+        ):
+            request()
+        # tracemalloc сильно замедляет запрос, поэтому память меряем
+        # отдельным запросом, не смешивая с временем.
+        tracemalloc.start()
+        try:
+            request()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return {
+            'method': method.upper(),
+            'url': url,
+            'status': response.status_code,
+            'cold_ms': round(cold * 1000, 3),
+            'p50_ms': round(percentile(timings, 0.5) * 1000, 3),
+            'p99_ms': round(percentile(timings, 0.99) * 1000, 3),
+            'queries': len(queries),
+            'alloc_peak_kib': round(peak / 1024, 1),
+        }
+
+    def report(self, routes, previous=None):
+        columns = ('p50_ms', 'p99_ms', 'queries', 'alloc_peak_kib')
+        self.stdout.write(
+            f'{"маршрут":<18}{"код":>5}'
+            + ''.join(f'{column:>16}' for column in columns)
+        )
+        for name, route in routes.items():
+            cells = []
+            for column in columns:
+                cell = f'{route[column]:g}'
+                old = (previous or {}).get(name, {}).get(column)
+                if old:
+                    change = (route[column] - old) / old * 100
+                    cell += f' ({change:+.0f}%)'
+                cells.append(f'{cell:>16}')
+            self.stdout.write(
+                f'{name:<18}{route["status"]:>5}' + ''.join(cells)
+            )
@@ -0,0 +1,76 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from posts import transfer
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает группы, посты, комментарии и подписки в каталог, '
+        'по файлу NDJSON или CSV на вид данных. Прерванная выгрузка '
+        'продолжается с последней контрольной точки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory')
+        parser.add_argument(
+            '--format', choices=transfer.FORMATS, default='ndjson'
+        )
+        parser.add_argument(
+            '--kinds', nargs='+', choices=transfer.KINDS,
+            default=transfer.KINDS
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Начать заново, не глядя на контрольную точку.'
+        )
+
+    def handle(self, *args, **options):
+        directory = options['directory']
+        os.makedirs(directory, exist_ok=True)
+        checkpoint = transfer.Checkpoint(
+            os.path.join(directory, '.export_checkpoint.json'),
+            resume=not options['restart']
+        )
+        for kind in transfer.KINDS:
+            if kind in options['kinds']:
+                self.export(
+                    kind, directory, options['format'],
+                    options['chunk_size'], checkpoint
+                )
+
+    def export(self, kind, directory, format, chunk_size, checkpoint):
+        filename = transfer.path(directory, kind, format)
+        state = checkpoint.get(kind)
+        if state.get('format') != format or not os.path.exists(filename):
+            state = {}
+        if state.get('done'):
+            self.stdout.write(f'{kind}: уже выгружено {state["rows"]}')
+            return
+        rows, last = state.get('rows', 0), state.get('last', 0)
+        with open(
+            filename, 'r+' if state else 'w', encoding='utf-8', newline=''
+        ) as file:
+            if state:
+                # Отбрасываем то, что дописано после контрольной точки.
+                file.seek(state['offset'])
+                file.truncate()
+            writer = transfer.Writer(file, kind, format, header=not state)
+            for row in transfer.export_rows(kind, last, chunk_size):
+                writer.write(row)
+                rows, last = rows + 1, row['id']
+                if rows % chunk_size == 0:
+                    file.flush()
+                    checkpoint.save(
+                        kind, format=format, rows=rows, last=last,
+                        offset=file.tell()
+                    )
+            file.flush()
+            checkpoint.save(
+                kind, format=format, rows=rows, last=last,
+                offset=file.tell(), done=True
+            )
+        self.stdout.write(f'{kind}: выгружено {rows}')
@@ -0,0 +1,60 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет картинки постов, на которые не ссылается ни один пост. '
+        'Свежие файлы не трогает: их пост может быть ещё не сохранён.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-age', type=float, default=24,
+            help='Удалять файлы старше стольких часов.'
+        )
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        field = Post._meta.get_field('image')
+        storage = field.storage
+        root = field.upload_to.rstrip('/')
+        referenced = set(
+            Post.objects.exclude(image='').values_list('image', flat=True)
+            .iterator()
+        )
+        deadline = time.time() - options['min_age'] * 60 * 60
+        deleted = freed = 0
+        for name in self.walk(storage, root):
+            if name in referenced:
+                continue
+            # Пока шёл обход, ту же картинку могли загрузить заново.
+            if Post.objects.filter(image=name).exists():
+                continue
+            # Проверка времени — последней, прямо перед удалением: если
+            # пост с повторно загруженной картинкой ещё не сохранён,
+            # storage.save уже обновил время изменения файла.
+            path = storage.path(name)
+            if os.path.getmtime(path) > deadline:
+                continue
+            deleted += 1
+            freed += os.path.getsize(path)
+            if not options['dry_run']:
+                storage.delete(name)
+        verb = 'Будет удалено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(
+            f'{verb} файлов: {deleted}, {freed / 2 ** 20:.1f} МБ'
+        )
+
+    def walk(self, storage, directory):
+        if not storage.exists(directory):
+            return
+        directories, files = storage.listdir(directory)
+        for name in files:
+            yield f'{directory}/{name}'
+        for name in directories:
+            yield from self.walk(storage, f'{directory}/{name}')
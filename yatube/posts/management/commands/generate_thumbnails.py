@@ -0,0 +1,35 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from posts.models import Post
+from posts.thumbnails import generate
+
+
+class Command(BaseCommand):
+    help = 'Строит миниатюры картинок постов в нескольких процессах.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Перестроить и уже готовые миниатюры.'
+        )
+        parser.add_argument('--processes', type=int, default=os.cpu_count())
+        parser.add_argument('--chunk-size', type=int, default=50)
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='')
+        if not options['all']:
+            posts = posts.filter(thumbnail='')
+        post_ids = list(posts.values_list('pk', flat=True))
+        # Дочерние процессы не должны унаследовать открытое соединение.
+        connections.close_all()
+        with ProcessPoolExecutor(options['processes']) as pool:
+            for _ in pool.map(
+                generate, post_ids, chunksize=options['chunk_size']
+            ):
+                pass
+        self.stdout.write(f'Миниатюр построено: {len(post_ids)}')
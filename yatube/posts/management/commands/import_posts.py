@@ -0,0 +1,94 @@
+import os
+from itertools import islice
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from core.cache import bump_version
+from posts import transfer
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает группы, посты, комментарии и подписки из каталога, '
+        'выгруженного export_posts. Прерванная загрузка продолжается '
+        'с последней контрольной точки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory')
+        parser.add_argument(
+            '--format', choices=transfer.FORMATS, default='ndjson'
+        )
+        parser.add_argument(
+            '--kinds', nargs='+', choices=transfer.KINDS,
+            default=transfer.KINDS
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл контрольной точки, по умолчанию в каталоге выгрузки.'
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Начать заново, не глядя на контрольную точку.'
+        )
+        parser.add_argument(
+            '--skip-rebuild',
+            action='store_true',
+            help='Не пересчитывать счётчики, ленты и поисковый индекс.'
+        )
+
+    def handle(self, *args, **options):
+        directory = options['directory']
+        checkpoint = transfer.Checkpoint(
+            options['checkpoint']
+            or os.path.join(directory, '.import_checkpoint.json'),
+            resume=not options['restart']
+        )
+        with transfer.keep_created():
+            for kind in transfer.KINDS:
+                filename = transfer.path(directory, kind, options['format'])
+                if kind in options['kinds'] and os.path.exists(filename):
+                    self.load(
+                        kind, filename, options['format'],
+                        options['batch_size'], checkpoint
+                    )
+        # Явные id сдвигают последовательности PostgreSQL.
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(
+                no_style(), list(transfer.MODELS.values())
+            ):
+                cursor.execute(sql)
+        if not options['skip_rebuild']:
+            for command in (
+                'reconcile_counters', 'rebuild_feeds', 'rebuild_search_index'
+            ):
+                call_command(command, stdout=self.stdout)
+        bump_version('posts', 'groups', 'users', 'feeds')
+
+    def load(self, kind, filename, format, batch_size, checkpoint):
+        state = checkpoint.get(kind)
+        if state.get('format') != format:
+            state = {}
+            if kind == 'posts':
+                transfer.forget_remapped_posts()
+        if state.get('done'):
+            self.stdout.write(f'{kind}: уже загружено {state["rows"]}')
+            return
+        rows = state.get('rows', 0)
+        with open(filename, encoding='utf-8', newline='') as file:
+            source = islice(transfer.read_rows(file, format), rows, None)
+            while True:
+                batch = list(islice(source, batch_size))
+                if not batch:
+                    break
+                with transaction.atomic():
+                    transfer.import_batch(kind, batch)
+                rows += len(batch)
+                checkpoint.save(kind, format=format, rows=rows)
+        checkpoint.save(kind, format=format, rows=rows, done=True)
+        self.stdout.write(f'{kind}: загружено {rows}')
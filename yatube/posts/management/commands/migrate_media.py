@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from core.storage import is_hashed
+from posts.models import Post
+from posts.signals import bump_post_versions
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит картинки постов в имена по содержимому: одинаковые '
+        'файлы остаются на диске в одном экземпляре. Старые файлы '
+        'потом удаляет gc_media.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').only(
+            'image', 'author', 'group'
+        ).order_by('pk')
+        storage = Post._meta.get_field('image').storage
+        moved = missing = 0
+        names = set()
+        for post in posts.iterator(chunk_size=options['batch_size']):
+            name = post.image.name
+            if is_hashed(name):
+                continue
+            if not storage.exists(name):
+                missing += 1
+                continue
+            with storage.open(name) as content:
+                new_name = storage.save(name, content)
+            names.add(new_name)
+            # Картинку могли заменить, пока файл копировался.
+            if Post.objects.filter(pk=post.pk, image=name).update(
+                image=new_name
+            ):
+                bump_post_versions(post)
+                moved += 1
+        self.stdout.write(
+            f'Перенесено картинок: {moved}, разных файлов: {len(names)}, '
+            f'нет на диске: {missing}'
+        )
@@ -0,0 +1,23 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts import feed
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает материализованные ленты подписок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('usernames', nargs='*')
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(follower__isnull=False).distinct()
+        if options['usernames']:
+            users = User.objects.filter(username__in=options['usernames'])
+        for user in users.iterator():
+            with transaction.atomic():
+                feed.rebuild(user)
+            self.stdout.write(f'Лента {user.username} пересобрана')
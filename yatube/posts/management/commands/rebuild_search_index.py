@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts import search
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс постов.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            search.rebuild_index()
+        self.stdout.write('Поисковый индекс перестроен')
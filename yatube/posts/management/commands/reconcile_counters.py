@@ -0,0 +1,23 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts import counters
+from posts.models import Post
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает денормализованные счётчики постов, комментариев '
+        'и подписок по исходным таблицам.'
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            users = counters.reconcile_users(User.objects.all())
+            posts = counters.reconcile_posts(Post.objects.all())
+        self.stdout.write(
+            f'Пересчитано: пользователей {users}, постов {posts}'
+        )
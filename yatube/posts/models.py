@@ -1,5 +1,6 @@
 from django.db import models
 from core.models import CreatedModel
+from core.storage import HashedFileSystemStorage
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -16,6 +17,33 @@ class Group(models.Model):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    def for_feed(self):
+        """Посты с автором и группой ровно в объёме, нужном карточкам."""
+        return self.select_related('author', 'group').only(
+            'text', 'created', 'image', 'thumbnail', 'comments_count',
+            'author__username', 'author__first_name', 'author__last_name',
+            'group__slug', 'group__title',
+        )
+
+    def for_detail(self):
+        """Пост для отдельной страницы вместе со счётчиками автора."""
+        return self.select_related('author__stats', 'group').only(
+            'text', 'created', 'image', 'thumbnail', 'comments_count',
+            'author__username', 'author__first_name', 'author__last_name',
+            'author__stats__posts_count',
+            'group__slug', 'group__title',
+        )
+
+
+class CommentQuerySet(models.QuerySet):
+    def for_post(self):
+        """Комментарии с авторами для страницы поста."""
+        return self.select_related('author').only(
+            'text', 'created', 'post_id', 'author__username',
+        )
+
+
 class Post(CreatedModel):
     group = models.ForeignKey(Group,
                               on_delete=models.SET_NULL,
@@ -28,15 +56,46 @@ class Post(CreatedModel):
         on_delete=models.CASCADE,
         related_name='posts'
     )
+    # Имена по содержимому: одинаковые картинки хранятся один раз.
     image = models.ImageField(
         'Картинка',
         upload_to='posts/',
+        storage=HashedFileSystemStorage(),
         blank=True
     )
+    # Заполняется фоновой задачей posts.thumbnails, пока пусто —
+    # шаблоны показывают исходную картинку.
+    thumbnail = models.ImageField(
+        'Миниатюра',
+        blank=True,
+        editable=False
+    )
+    comments_count = models.IntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta(CreatedModel.Meta):
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
+        # Под ключ курсорной пагинации (created, id) в каждой из лент.
+        indexes = [
+            models.Index(
+                fields=['-created', '-id'],
+                name='post_created_idx'
+            ),
+            models.Index(
+                fields=['author', '-created', '-id'],
+                name='post_author_created_idx'
+            ),
+            models.Index(
+                fields=['group', '-created', '-id'],
+                name='post_group_created_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text[:POST_LENGHT]
@@ -55,9 +114,17 @@ class Comment(CreatedModel):
     )
     text = models.TextField('Текст', help_text='Текст нового комментария')
 
+    objects = CommentQuerySet.as_manager()
+
     class Meta(CreatedModel.Meta):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=['post', '-created', '-id'],
+                name='comment_post_created_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text
@@ -82,3 +149,62 @@ class Follow(models.Model):
                 name='unique_following'
             ),
         ]
+
+
+class FeedEntry(models.Model):
+    """Материализованная запись ленты подписок: пост в ленте читателя."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='feed_entries'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='feed_entries'
+    )
+    # Копия post.created: лента читается одним проходом по индексу.
+    created = models.DateTimeField()
+
+    class Meta():
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'],
+                name='unique_feed_entry'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-created', '-post'],
+                name='feedentry_user_created_idx'
+            ),
+        ]
+
+
+class UserStats(models.Model):
+    """Денормализованные счётчики пользователя, обновляются сигналами."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+    posts_count = models.IntegerField('Количество постов', default=0)
+    followers_count = models.IntegerField('Количество подписчиков', default=0)
+    following_count = models.IntegerField('Количество подписок', default=0)
+
+    def __str__(self):
+        return f'Счётчики {self.user}'
+
+
+class RemappedPost(models.Model):
+    """
+    Пост выгрузки, загруженный import_posts под другим id: по старому
+    id его находят комментарии, в том числе в следующих запусках.
+    """
+    old_id = models.IntegerField('id в выгрузке', primary_key=True)
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
@@ -0,0 +1,47 @@
+"""
+Области версий кеша для страниц, открытых по адресу.
+
+Получают аргументы view и нужны там, где версию надо знать до вызова
+view: в условном GET API и в кеше страниц. Найденные группу и автора
+запрос запоминает, и view берёт их оттуда же без второго запроса.
+"""
+from django.contrib.auth import get_user_model
+from django.http import Http404
+
+from .models import Group
+
+User = get_user_model()
+
+
+def _find(request, name, queryset, **lookup):
+    found = getattr(request, 'scope_objects', None)
+    if found is None:
+        found = request.scope_objects = {}
+    if name not in found:
+        found[name] = queryset.filter(**lookup).first()
+    if found[name] is None:
+        raise Http404
+    return found[name]
+
+
+def find_group(request, slug):
+    return _find(request, 'group', Group.objects.all(), slug=slug)
+
+
+def find_author(request, username):
+    return _find(
+        request, 'author', User.objects.select_related('stats'),
+        username=username
+    )
+
+
+def group_scope(request, slug):
+    return f'group:{find_group(request, slug).pk}'
+
+
+def profile_scope(request, username):
+    return f'profile:{find_author(request, username).pk}'
+
+
+def post_scope(request, post_id):
+    return f'post:{post_id}'
@@ -0,0 +1,156 @@
+"""
+Полнотекстовый поиск по постам.
+
+Индекс хранится в отдельной таблице, которая создаётся после миграций
+и обновляется сигналами при сохранении и удалении постов: на SQLite это
+виртуальная таблица FTS5, на PostgreSQL — tsvector с GIN-индексом.
+Результаты упорядочены по релевантности и листаются курсором
+(релевантность, id). На прочих СУБД поиск сводится к icontains.
+"""
+import re
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+
+from .models import Post
+
+TABLE = 'posts_post_search'
+WORD = re.compile(r'\w+')
+
+
+def _vendor():
+    return connection.vendor
+
+
+def create_index_table(using=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    Создаёт таблицу индекса в базе using, если её ещё нет. Обработчик
+    post_migrate: migrate --database=<alias> создаёт её и в той базе.
+    """
+    database = connections[using]
+    with database.cursor() as cursor:
+        if database.vendor == 'sqlite':
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} '
+                "USING fts5(text, tokenize='unicode61')"
+            )
+        elif database.vendor == 'postgresql':
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS {TABLE} ('
+                'post_id integer PRIMARY KEY, document tsvector NOT NULL)'
+            )
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {TABLE}_document_idx '
+                f'ON {TABLE} USING GIN (document)'
+            )
+
+
+def index_post(post):
+    with connection.cursor() as cursor:
+        if _vendor() == 'sqlite':
+            cursor.execute(
+                f'DELETE FROM {TABLE} WHERE rowid = %s', [post.pk]
+            )
+            cursor.execute(
+                f'INSERT INTO {TABLE} (rowid, text) VALUES (%s, %s)',
+                [post.pk, post.text]
+            )
+        elif _vendor() == 'postgresql':
+            cursor.execute(
+                f'INSERT INTO {TABLE} (post_id, document) '
+                'VALUES (%s, to_tsvector(%s, %s)) '
+                'ON CONFLICT (post_id) DO UPDATE SET document = '
+                'EXCLUDED.document',
+                [post.pk, settings.SEARCH_CONFIG, post.text]
+            )
+
+
+def unindex_post(post_id):
+    with connection.cursor() as cursor:
+        if _vendor() == 'sqlite':
+            cursor.execute(
+                f'DELETE FROM {TABLE} WHERE rowid = %s', [post_id]
+            )
+        elif _vendor() == 'postgresql':
+            cursor.execute(
+                f'DELETE FROM {TABLE} WHERE post_id = %s', [post_id]
+            )
+
+
+def rebuild_index():
+    """Перестраивает индекс по всем постам."""
+    create_index_table()
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE}')
+    for post in Post.objects.only('text').iterator():
+        index_post(post)
+
+
+def encode_cursor(rank, pk):
+    raw = f'{rank!r}|{pk}'
+    return urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    rank, pk = urlsafe_b64decode(padded.encode()).decode().split('|')
+    return float(rank), int(pk)
+
+
+def _ranked_ids(words, after, limit):
+    """[(id, rank)] лучших совпадений; rank тем меньше, чем выше пост."""
+    params = []
+    if _vendor() == 'sqlite':
+        sql = (
+            f'SELECT rowid AS post_id, rank FROM {TABLE} '
+            f'WHERE {TABLE} MATCH %s'
+        )
+        params.append(' '.join(f'"{word}"' for word in words))
+    else:
+        # ts_rank растёт с релевантностью: меняем знак, чтобы порядок
+        # совпадал с FTS5 и курсор работал одинаково.
+        sql = (
+            'SELECT post_id, -ts_rank(document, query) AS rank '
+            f'FROM {TABLE}, plainto_tsquery(%s, %s) query '
+            'WHERE document @@ query'
+        )
+        params.extend([settings.SEARCH_CONFIG, ' '.join(words)])
+    sql = f'SELECT * FROM ({sql}) matches'
+    if after:
+        sql += ' WHERE rank > %s OR (rank = %s AND post_id > %s)'
+        params.extend([after[0], after[0], after[1]])
+    sql += ' ORDER BY rank, post_id LIMIT %s'
+    params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def search(query, cursor=None, limit=10):
+    """
+    Посты по запросу в порядке релевантности.
+
+    Возвращает пару (посты, курсор следующей страницы или None).
+    """
+    words = WORD.findall(query)
+    if not words:
+        return [], None
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError:
+            after = None
+    if _vendor() not in ('sqlite', 'postgresql'):
+        posts = Post.objects.for_feed()
+        for word in words:
+            posts = posts.filter(text__icontains=word)
+        return list(posts[:limit]), None
+    rows = _ranked_ids(words, after, limit + 1)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][1], rows[-1][0])
+    posts = Post.objects.for_feed().in_bulk([pk for pk, _ in rows])
+    return [posts[pk] for pk, _ in rows if pk in posts], next_cursor
@@ -0,0 +1,112 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core.cache import bump_version_on_commit
+from . import counters, feed, tasks
+from .models import Comment, Follow, Group, Post, UserStats
+
+User = get_user_model()
+USER_NAME_FIELDS = {'username', 'first_name', 'last_name'}
+
+
+def bump_post_versions(post, *scopes):
+    """Сбрасывает фрагменты всех страниц, где показан пост."""
+    bump_version_on_commit(
+        'posts',
+        f'post:{post.pk}',
+        f'profile:{post.author_id}',
+        f'group:{post.group_id}',
+        *scopes
+    )
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields, **kwargs):
+    if created:
+        UserStats.objects.get_or_create(user=instance)
+    elif update_fields is None or USER_NAME_FIELDS & set(update_fields):
+        # Имена авторов есть на всех карточках, а вход в систему
+        # сохраняет только last_login и ничего не сбрасывает.
+        bump_version_on_commit('users')
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    bump_version_on_commit('groups', f'group:{instance.pk}')
+
+
+@receiver(pre_save, sender=Post)
+def remember_old_group(sender, instance, **kwargs):
+    instance._old_group_id = None
+    if instance.pk:
+        instance._old_group_id = Post.objects.filter(
+            pk=instance.pk
+        ).values_list('group', flat=True).first()
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.change_user_stats(
+            instance.author_id, create=True, posts_count=1
+        )
+        tasks.fan_out_post.delay(instance.pk, key=f'fan_out:{instance.pk}')
+    tasks.reindex_post.delay(instance.pk, key=f'search:{instance.pk}')
+    old_group_id = getattr(instance, '_old_group_id', None)
+    if old_group_id not in (None, instance.group_id):
+        bump_post_versions(instance, f'group:{old_group_id}')
+    else:
+        bump_post_versions(instance)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    counters.change_user_stats(instance.author_id, posts_count=-1)
+    tasks.reindex_post.delay(instance.pk, key=f'search:{instance.pk}')
+    bump_post_versions(instance)
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, **kwargs):
+    if created:
+        counters.change_comments_count(instance.post_id, 1)
+        bump_post_versions(instance.post)
+        tasks.notify_comment.delay(
+            instance.pk, key=f'notify_comment:{instance.pk}'
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    counters.change_comments_count(instance.post_id, -1)
+    # При каскадном удалении поста его уже может не быть в базе.
+    post = Post.objects.filter(pk=instance.post_id).first()
+    if post is not None:
+        bump_post_versions(post)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, **kwargs):
+    if created:
+        counters.change_user_stats(
+            instance.author_id, create=True, followers_count=1
+        )
+        counters.change_user_stats(
+            instance.user_id, create=True, following_count=1
+        )
+        feed.backfill(instance)
+        bump_version_on_commit(f'follow:{instance.user_id}')
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    counters.change_user_stats(instance.author_id, followers_count=-1)
+    counters.change_user_stats(instance.user_id, following_count=-1)
+    feed.prune(instance)
+    if feed.became_light(instance.author_id):
+        tasks.backfill_author.delay(
+            instance.author_id, key=f'backfill_author:{instance.author_id}'
+        )
+    bump_version_on_commit(f'follow:{instance.user_id}')
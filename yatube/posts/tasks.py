@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.core.mail import send_mail
+from django.template.loader import render_to_string
+from django.urls import reverse
+
+from core.cache import bump_version
+from core.tasks import task
+from . import feed, search
+from .models import Comment, Post
+
+
+@task()
+def process_image(post_id):
+    """Пережимает картинку поста и строит её миниатюру."""
+    from . import images, thumbnails
+    images.process(post_id)
+    thumbnails.generate(post_id)
+
+
+@task()
+def fan_out_post(post_id):
+    post = Post.objects.filter(pk=post_id).only('author', 'created').first()
+    if post is not None:
+        feed.fan_out(post)
+        # Ленты подписок могли закешировать до раскладки поста.
+        bump_version('feeds')
+
+
+@task()
+def backfill_author(author_id):
+    """Возвращает в ленты посты автора, переставшего быть «тяжёлым»."""
+    feed.backfill_author(author_id)
+    bump_version('feeds')
+
+
+@task()
+def reindex_post(post_id):
+    """Приводит поисковый индекс поста к его текущему состоянию."""
+    post = Post.objects.filter(pk=post_id).only('text').first()
+    if post is None:
+        search.unindex_post(post_id)
+    else:
+        search.index_post(post)
+
+
+@task()
+def notify_comment(comment_id):
+    """Пишет автору поста о новом комментарии."""
+    comment = Comment.objects.select_related(
+        'author', 'post__author'
+    ).filter(pk=comment_id).first()
+    if comment is None:
+        return
+    recipient = comment.post.author
+    if not recipient.email or recipient == comment.author:
+        return
+    url = settings.SITE_URL + reverse(
+        'posts:post_detail', args=(comment.post_id,)
+    )
+    send_mail(
+        'Новый комментарий к вашему посту',
+        render_to_string(
+            'posts/email/new_comment.txt', {'comment': comment, 'url': url}
+        ),
+        None,
+        [recipient.email],
+    )
@@ -0,0 +1,38 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts.models import Post
+from posts.urls import urlpatterns
+
+
+class BenchRoutesTestClass(TestCase):
+    def test_bench_routes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'bench.json')
+            call_command(
+                'bench_routes', users=5, groups=2, posts=30, comments=20,
+                follows=10, repeat=3, warmup=1, output=output,
+                stdout=StringIO(), stderr=StringIO()
+            )
+            call_command(
+                'bench_routes', users=5, groups=2, posts=30, comments=20,
+                follows=10, repeat=3, warmup=1, output=output,
+                compare=output, stdout=StringIO(), stderr=StringIO()
+            )
+            with open(output, encoding='utf-8') as file:
+                result = json.load(file)
+        self.assertEqual(
+            set(result['routes']),
+            {pattern.name for pattern in urlpatterns}
+        )
+        for name, route in result['routes'].items():
+            with self.subTest(name=name):
+                self.assertLess(route['status'], 400)
+                self.assertGreater(route['queries'], 0)
+                self.assertLessEqual(route['p50_ms'], route['p99_ms'])
+        self.assertFalse(Post.objects.exists())
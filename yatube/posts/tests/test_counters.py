@@ -0,0 +1,73 @@
+from io import StringIO
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from ..models import Comment, Follow, Post, UserStats
+
+User = get_user_model()
+
+
+class CountersTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def stats(self, user):
+        return UserStats.objects.get(user=user)
+
+    def test_counters_follow_writes(self):
+        """Счётчики меняются при создании и удалении объектов."""
+        post = Post.objects.create(author=self.author, text='Пост')
+        comment = Comment.objects.create(
+            post=post,
+            author=self.reader,
+            text='Комментарий'
+        )
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(self.stats(self.author).posts_count, 1)
+        self.assertEqual(self.stats(self.author).followers_count, 1)
+        self.assertEqual(self.stats(self.reader).following_count, 1)
+        comment.delete()
+        follow.delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+        self.assertEqual(self.stats(self.author).followers_count, 0)
+        self.assertEqual(self.stats(self.reader).following_count, 0)
+        post.delete()
+        self.assertEqual(self.stats(self.author).posts_count, 0)
+
+    def test_reconcile_counters(self):
+        """Команда reconcile_counters исправляет расхождения."""
+        post = Post.objects.create(author=self.author, text='Пост')
+        Comment.objects.create(post=post, author=self.reader, text='Текст')
+        Follow.objects.create(user=self.reader, author=self.author)
+        UserStats.objects.all().delete()
+        Post.objects.update(comments_count=10)
+        call_command('reconcile_counters', stdout=StringIO())
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(self.stats(self.author).posts_count, 1)
+        self.assertEqual(self.stats(self.author).followers_count, 1)
+        self.assertEqual(self.stats(self.reader).following_count, 1)
+
+    def test_write_and_counters_share_transaction(self):
+        """Сбой при обновлении счётчика откатывает и саму запись."""
+        client = Client()
+        client.force_login(self.reader)
+        with mock.patch(
+            'posts.counters.change_user_stats', side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                client.post(
+                    reverse('posts:profile_follow', args=('author',))
+                )
+            with self.assertRaises(RuntimeError):
+                client.post(reverse('posts:post_create'), {'text': 'Пост'})
+        self.assertFalse(Follow.objects.exists())
+        self.assertFalse(Post.objects.exists())
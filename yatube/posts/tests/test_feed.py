@@ -0,0 +1,92 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.testing import OnCommitMixin
+from ..models import FeedEntry, Follow, Post
+
+User = get_user_model()
+
+
+class FollowFeedTests(OnCommitMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.old_post = Post.objects.create(
+            author=cls.author,
+            text='Пост до подписки'
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def feed(self):
+        response = self.client.get(reverse('posts:follow_index'))
+        return list(response.context['page_obj'])
+
+    def test_follow_backfills_and_unfollow_prunes(self):
+        """Подписка заполняет ленту, отписка её очищает."""
+        self.client.get(
+            reverse('posts:profile_follow', args=(self.author.username,))
+        )
+        self.assertTrue(
+            FeedEntry.objects.filter(
+                user=self.reader,
+                post=self.old_post
+            ).exists()
+        )
+        self.client.get(
+            reverse('posts:profile_unfollow', args=(self.author.username,))
+        )
+        self.assertFalse(FeedEntry.objects.filter(user=self.reader).exists())
+        self.assertEqual(self.feed(), [])
+
+    def test_new_post_fanned_out(self):
+        """Новый пост раскладывается по лентам подписчиков."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        with self.captureOnCommitCallbacks(execute=True):
+            new_post = Post.objects.create(
+                author=self.author, text='Новый пост'
+            )
+        self.assertTrue(
+            FeedEntry.objects.filter(user=self.reader, post=new_post).exists()
+        )
+        self.assertEqual(self.feed(), [new_post, self.old_post])
+
+    def test_heavy_author_read_on_demand(self):
+        """Посты «тяжёлых» авторов подмешиваются в ленту при чтении."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        with override_settings(FEED_FANOUT_FOLLOWERS_LIMIT=0):
+            with self.captureOnCommitCallbacks(execute=True):
+                new_post = Post.objects.create(
+                    author=self.author,
+                    text='Новый пост'
+                )
+            self.assertFalse(
+                FeedEntry.objects.filter(post=new_post).exists()
+            )
+            self.assertEqual(self.feed(), [new_post, self.old_post])
+
+    def test_light_again_author_backfilled(self):
+        """Отписка до порога раскладывает посты «тяжёлого» автора."""
+        other = User.objects.create_user(username='other')
+        Follow.objects.create(user=self.reader, author=self.author)
+        follow = Follow.objects.create(user=other, author=self.author)
+        with override_settings(FEED_FANOUT_FOLLOWERS_LIMIT=1):
+            with self.captureOnCommitCallbacks(execute=True):
+                new_post = Post.objects.create(
+                    author=self.author,
+                    text='Новый пост'
+                )
+            self.assertFalse(
+                FeedEntry.objects.filter(post=new_post).exists()
+            )
+            with self.captureOnCommitCallbacks(execute=True):
+                follow.delete()
+        self.assertTrue(
+            FeedEntry.objects.filter(user=self.reader, post=new_post).exists()
+        )
+        self.assertEqual(self.feed(), [new_post, self.old_post])
@@ -0,0 +1,92 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import transaction
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.testing import OnCommitMixin
+from .. import follow_graph
+from ..models import Follow
+
+User = get_user_model()
+
+
+class FollowGraphTests(OnCommitMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.authors = [
+            User.objects.create_user(username=f'author{number}')
+            for number in range(3)
+        ]
+        for author in cls.authors[:2]:
+            Follow.objects.create(user=cls.reader, author=author)
+        Follow.objects.create(user=cls.authors[0], author=cls.reader)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_is_following_is_batched(self):
+        with self.assertNumQueries(1):
+            follow_graph.following(self.reader)
+        with self.assertNumQueries(0):
+            following = follow_graph.is_following(self.reader, self.authors)
+        self.assertEqual(following, {
+            self.authors[0].pk: True,
+            self.authors[1].pk: True,
+            self.authors[2].pk: False,
+        })
+        self.assertEqual(
+            follow_graph.is_following(AnonymousUser(), self.authors[:1]),
+            {self.authors[0].pk: False}
+        )
+
+    def test_follow_and_unfollow_invalidate(self):
+        follow_graph.following(self.reader)
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                follow = Follow.objects.create(
+                    user=self.reader, author=self.authors[2]
+                )
+                # До коммита читатели видят прежнее множество.
+                self.assertNotIn(
+                    self.authors[2].pk, follow_graph.following(self.reader)
+                )
+        self.assertIn(self.authors[2].pk, follow_graph.following(self.reader))
+        with self.captureOnCommitCallbacks(execute=True):
+            follow.delete()
+        self.assertNotIn(
+            self.authors[2].pk, follow_graph.following(self.reader)
+        )
+
+    def test_mutual(self):
+        with self.assertNumQueries(1):
+            graph = follow_graph.following_many(
+                [self.reader] + self.authors
+            )
+        self.assertEqual(graph[self.authors[2].pk], frozenset())
+        self.assertTrue(follow_graph.is_mutual(self.reader, self.authors[0]))
+        self.assertFalse(
+            follow_graph.is_mutual(self.reader, self.authors[1])
+        )
+        self.assertEqual(
+            follow_graph.mutual(self.reader), {self.authors[0].pk}
+        )
+
+    def test_counts(self):
+        reader = User.objects.get(pk=self.reader.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(follow_graph.following_count(reader), 2)
+            self.assertEqual(follow_graph.followers_count(reader), 1)
+
+    def test_profile_reuses_cached_graph(self):
+        client = Client()
+        client.force_login(self.reader)
+        url = reverse('posts:profile', args=(self.authors[0].username,))
+        client.get(url)
+        # Сессия, пользователь, автор и посты; подписка — из кеша.
+        with self.assertNumQueries(4):
+            response = client.get(url)
+        self.assertTrue(response.context['following'])
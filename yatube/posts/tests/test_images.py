@@ -0,0 +1,79 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from core.testing import OnCommitMixin
+from ..images import output_format, process
+from ..models import Post
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def image_file(name='image.png', size=(50, 50), exif=None):
+    buffer = BytesIO()
+    image = Image.new('RGB', size, color=(200, 0, 0))
+    if exif is None:
+        image.save(buffer, 'PNG')
+    else:
+        image.save(buffer, 'JPEG', exif=exif)
+    return SimpleUploadedFile(name, buffer.getvalue(), 'image/png')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class PostImageTests(OnCommitMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def create(self, image):
+        return self.client.post(
+            reverse('posts:post_create'),
+            {'text': 'Пост с картинкой', 'image': image}
+        )
+
+    @override_settings(FILE_UPLOAD_MAX_SIZE=100)
+    def test_oversized_upload_is_rejected(self):
+        response = self.create(image_file())
+        self.assertFormError(
+            response, 'form', 'image', 'Файл больше 100\xa0байт.'
+        )
+        self.assertFalse(Post.objects.exists())
+
+    @override_settings(POST_IMAGE_MAX_PIXELS=100)
+    def test_dimensions_are_limited(self):
+        response = self.create(image_file())
+        self.assertIn('50×50', response.context['form'].errors['image'][0])
+        self.assertFalse(Post.objects.exists())
+
+    @override_settings(POST_IMAGE_MAX_SIDE=20)
+    def test_image_is_reencoded(self):
+        """Картинка уменьшается и теряет метаданные."""
+        exif = Image.Exif()
+        exif[0x010F] = 'Камера'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create(image_file('photo.jpg', size=(80, 40), exif=exif))
+        post = Post.objects.get()
+        self.assertTrue(post.thumbnail)
+        with Image.open(post.image.path) as image:
+            self.assertEqual(image.size, (20, 10))
+            self.assertEqual(image.format, output_format())
+            self.assertNotIn('exif', image.info)
+        self.assertFalse(process(post.pk))
@@ -0,0 +1,58 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from core.testing import IndexUsageMixin
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class IndexUsageTests(IndexUsageMixin, TestCase):
+    """Основные выборки лент и комментариев идут по индексам."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Тестовый пост',
+            group=cls.group
+        )
+        Comment.objects.create(
+            post=cls.post,
+            author=cls.reader,
+            text='Комментарий'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def test_feeds_use_indexes(self):
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_post', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.author.username,)),
+            reverse('posts:follow_index'),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertViewUsesIndexes(
+                    url, 'posts_post', self.reader_client
+                )
+
+    def test_comments_use_index(self):
+        self.assertViewUsesIndexes(
+            reverse('posts:post_detail', args=(self.post.pk,)),
+            'posts_comment'
+        )
@@ -0,0 +1,102 @@
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from core.storage import is_hashed
+from ..models import Post
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class HashedMediaTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def tearDown(self):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def create_post(self, name):
+        return Post.objects.create(
+            author=self.user, text='Пост',
+            image=SimpleUploadedFile(name, SMALL_GIF, 'image/gif')
+        )
+
+    def test_identical_images_are_stored_once(self):
+        first = self.create_post('first.gif')
+        second = self.create_post('Second.GIF')
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertTrue(is_hashed(first.image.name))
+        directory = os.path.dirname(first.image.path)
+        self.assertEqual(len(os.listdir(directory)), 1)
+
+    def test_reupload_refreshes_orphan(self):
+        """Повторно загруженный файл-сирота не удаляется gc_media."""
+        storage = Post._meta.get_field('image').storage
+        name = storage.save('posts/orphan.gif', ContentFile(SMALL_GIF))
+        old = time.time() - 48 * 60 * 60
+        os.utime(storage.path(name), (old, old))
+        self.create_post('again.gif')
+        self.assertGreater(os.path.getmtime(storage.path(name)), old + 60)
+        call_command('gc_media', min_age=1, stdout=StringIO())
+        self.assertTrue(storage.exists(name))
+
+    def test_hashed_media_is_immutable(self):
+        post = self.create_post('image.gif')
+        response = self.client.get(post.image.url)
+        self.assertIn('immutable', response['Cache-Control'])
+
+    def test_migrate_and_gc(self):
+        """Старые картинки переносятся, лишние файлы удаляются."""
+        storage = Post._meta.get_field('image').storage
+        os.makedirs(os.path.join(TEMP_MEDIA_ROOT, 'posts'))
+        for name in ('posts/old.gif', 'posts/copy.gif'):
+            with open(os.path.join(TEMP_MEDIA_ROOT, name), 'wb') as file:
+                file.write(SMALL_GIF)
+            Post.objects.create(author=self.user, text='Пост', image=name)
+        output = StringIO()
+        call_command('migrate_media', stdout=output)
+        self.assertIn('Перенесено картинок: 2, разных файлов: 1', (
+            output.getvalue()
+        ))
+        names = set(Post.objects.values_list('image', flat=True))
+        self.assertEqual(len(names), 1)
+        self.assertTrue(is_hashed(names.pop()))
+        storage.save('posts/orphan.gif', ContentFile(b'orphan'))
+        call_command('gc_media', min_age=1, stdout=StringIO())
+        self.assertTrue(storage.exists('posts/old.gif'))
+        call_command('gc_media', min_age=0, stdout=StringIO())
+        self.assertEqual(
+            list(self.walk(TEMP_MEDIA_ROOT)),
+            [storage.path(Post.objects.first().image.name)]
+        )
+
+    def walk(self, root):
+        for directory, _, files in os.walk(root):
+            for name in files:
+                yield os.path.join(directory, name)
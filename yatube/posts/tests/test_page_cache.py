@@ -0,0 +1,146 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.test import (
+    Client, TestCase, TransactionTestCase, override_settings,
+)
+from django.test.client import RequestFactory
+
+from core.cache import get_version
+from core.page_cache import normalize_query, url_key
+from core.testing import OnCommitMixin
+from ..models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class PageCacheTests(OnCommitMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, text='Пост', group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest = Client()
+
+    def get(self, url, client=None):
+        return (client or self.guest).get(url)
+
+    def test_anonymous_pages_are_cached(self):
+        """Повторный запрос анонима отдаётся из кеша."""
+        # Из базы читается только id группы или автора для версии.
+        pages = {'/': 0, '/group/group/': 1, '/profile/author/': 1}
+        for url, queries in pages.items():
+            with self.subTest(url=url):
+                self.assertEqual(self.get(url)['X-Page-Cache'], 'miss')
+                with self.assertNumQueries(queries):
+                    response = self.get(url)
+                self.assertEqual(response['X-Page-Cache'], 'hit')
+                self.assertContains(response, 'Пост')
+
+    def test_session_bypasses_cache(self):
+        """Запрос с cookie сессии идёт мимо кеша."""
+        client = Client()
+        client.force_login(self.author)
+        self.get('/', client)
+        response = self.get('/', client)
+        self.assertFalse(response.has_header('X-Page-Cache'))
+        self.assertContains(response, 'Выйти')
+
+    def test_page_query_is_normalized(self):
+        """?page=1 и мусор в адресе попадают в ключ главной страницы."""
+        self.get('/')
+        for url in ('/?page=1', '/?page=abc', '/?utm=1'):
+            with self.subTest(url=url):
+                self.assertEqual(self.get(url)['X-Page-Cache'], 'hit')
+        self.assertEqual(self.get('/?page=2')['X-Page-Cache'], 'miss')
+        request = RequestFactory().get('/?page=0')
+        self.assertEqual(normalize_query(request.GET), {'page': 'last'})
+        self.assertEqual(
+            url_key(RequestFactory().get('/?page=3&x=1')),
+            url_key(RequestFactory().get('/?x=2&page=03'))
+        )
+
+    def test_writes_purge_only_affected_pages(self):
+        """Запись сбрасывает страницы, где она видна, и только их."""
+        self.get('/group/group/')
+        self.get('/profile/other/')
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.create(
+                post=self.post, author=self.other, text='К'
+            )
+        self.assertEqual(self.get('/group/group/')['X-Page-Cache'], 'miss')
+        self.assertEqual(self.get('/profile/other/')['X-Page-Cache'], 'hit')
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.create(author=self.other, text='Новый пост')
+        self.assertEqual(self.get('/group/group/')['X-Page-Cache'], 'hit')
+        response = self.get('/profile/other/')
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        self.assertContains(response, 'Новый пост')
+        self.group.title = 'Переименованная'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group.save()
+        self.assertContains(self.get('/group/group/'), 'Переименованная')
+        self.author.first_name = 'Автор'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author.save()
+        self.assertEqual(self.get('/profile/other/')['X-Page-Cache'], 'miss')
+
+    def test_locked_page_serves_stale_copy(self):
+        """Пока страницу строит другой запрос, отдаётся прошлая версия."""
+        self.get('/')
+        self.post.text = 'Изменённый пост'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.save()
+        # Новую версию страницы будто бы уже строит другой запрос.
+        version = get_version('posts', 'groups', 'users')
+        key = f'page:{url_key(RequestFactory().get("/"))}:{version}'
+        cache.add(f'{key}:lock', 1)
+        response = self.get('/')
+        self.assertEqual(response['X-Page-Cache'], 'stale')
+        self.assertNotContains(response, 'Изменённый пост')
+        cache.delete(f'{key}:lock')
+        self.assertContains(self.get('/'), 'Изменённый пост')
+
+    @override_settings(PAGE_CACHE=False)
+    def test_disabled(self):
+        self.get('/')
+        self.assertFalse(self.get('/').has_header('X-Page-Cache'))
+
+
+class VersionOnCommitTests(TransactionTestCase):
+    """Версии сдвигаются только после коммита записи."""
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+
+    def test_bump_waits_for_commit(self):
+        version = get_version('posts', f'profile:{self.author.pk}')
+        with transaction.atomic():
+            Post.objects.create(author=self.author, text='Пост')
+            # Параллельный читатель ещё видит старые строки.
+            self.assertEqual(
+                get_version('posts', f'profile:{self.author.pk}'), version
+            )
+        self.assertNotEqual(
+            get_version('posts', f'profile:{self.author.pk}'), version
+        )
+
+    def test_rollback_keeps_version(self):
+        version = get_version('groups')
+        try:
+            with transaction.atomic():
+                Group.objects.create(title='Группа', slug='group')
+                raise ValueError
+        except ValueError:
+            pass
+        self.assertEqual(get_version('groups'), version)
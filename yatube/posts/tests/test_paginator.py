@@ -0,0 +1,66 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from http import HTTPStatus
+from core.paginator import CursorPaginator
+from ..models import Post
+from ..utils import POSTS_PER_PAGE
+
+NUMBER_OF_POSTS = 25
+
+User = get_user_model()
+
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Тестовый пост {number}')
+            for number in range(NUMBER_OF_POSTS)
+        )
+        cls.posts = list(Post.objects.order_by('-created', '-pk'))
+
+    def setUp(self):
+        cache.clear()
+        self.paginator = CursorPaginator(Post.objects.all(), POSTS_PER_PAGE)
+
+    def test_walk_forward_and_back(self):
+        """Курсоры обходят ленту без пропусков и повторов."""
+        first = self.paginator.get_cursor_page()
+        second = self.paginator.get_cursor_page(first.next_cursor)
+        third = self.paginator.get_cursor_page(second.next_cursor)
+        self.assertIsNone(first.previous_cursor)
+        self.assertIsNone(third.next_cursor)
+        self.assertEqual(
+            list(first) + list(second) + list(third),
+            self.posts
+        )
+        back = self.paginator.get_cursor_page(third.previous_cursor)
+        self.assertEqual(list(back), list(second))
+        self.assertEqual(
+            list(self.paginator.get_cursor_page(back.previous_cursor)),
+            list(first)
+        )
+
+    def test_broken_cursor_returns_first_page(self):
+        """Некорректный курсор отдаёт первую страницу."""
+        page = self.paginator.get_cursor_page('not-a-cursor')
+        self.assertEqual(list(page), self.posts[:POSTS_PER_PAGE])
+
+    def test_views_follow_cursor(self):
+        """Лента отдаёт следующую страницу по курсору."""
+        client = Client()
+        response = client.get(reverse('posts:index'))
+        next_cursor = response.context['page_obj'].next_cursor
+        self.assertContains(response, f'?cursor={next_cursor}')
+        response = client.get(
+            reverse('posts:index'), {'cursor': next_cursor}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(
+            list(response.context['page_obj']),
+            self.posts[POSTS_PER_PAGE:2 * POSTS_PER_PAGE]
+        )
@@ -0,0 +1,74 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from core.testing import QueryBudgetMixin
+from ..models import Comment, Follow, Group, Post
+
+NUMBER_OF_AUTHORS = 3
+POSTS_PER_AUTHOR = 5
+
+User = get_user_model()
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Число запросов страниц не зависит от числа постов на них."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.reader = User.objects.create_user(username='reader')
+        for number in range(NUMBER_OF_AUTHORS):
+            author = User.objects.create_user(username=f'author{number}')
+            Follow.objects.create(user=cls.reader, author=author)
+            for _ in range(POSTS_PER_AUTHOR):
+                post = Post.objects.create(
+                    author=author,
+                    text='Тестовый пост',
+                    group=cls.group
+                )
+                Comment.objects.create(
+                    post=post,
+                    author=cls.reader,
+                    text='Комментарий'
+                )
+        cls.author = author
+        cls.post = post
+
+    def setUp(self):
+        cache.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def test_anonymous_pages(self):
+        budgets = (
+            (reverse('posts:index'), 1),
+            (reverse('posts:group_post', args=(self.group.slug,)), 2),
+            (reverse('posts:profile', args=(self.author.username,)), 2),
+            (reverse('posts:post_detail', args=(self.post.pk,)), 2),
+            (reverse('posts:post_comments', args=(self.post.pk,)), 2),
+            (reverse('posts:index_more'), 1),
+            (reverse('posts:group_more', args=(self.group.slug,)), 2),
+            (reverse('posts:profile_more', args=(self.author.username,)), 2),
+        )
+        for url, budget in budgets:
+            with self.subTest(url=url):
+                self.assertQueryBudget(url, budget)
+
+    def test_authorized_pages(self):
+        # Сессия и пользователь добавляют по запросу к каждой странице.
+        budgets = (
+            (reverse('posts:index'), 3),
+            (reverse('posts:follow_index'), 4),
+            (reverse('posts:follow_more'), 4),
+            (reverse('posts:profile', args=(self.author.username,)), 5),
+            (reverse('posts:post_detail', args=(self.post.pk,)), 4),
+        )
+        for url, budget in budgets:
+            with self.subTest(url=url):
+                self.assertQueryBudget(url, budget, self.reader_client)
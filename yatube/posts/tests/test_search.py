@@ -0,0 +1,58 @@
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.testing import OnCommitMixin
+from ..models import Post
+from ..search import create_index_table, search
+
+User = get_user_model()
+
+
+class SearchTests(OnCommitMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.posts = [
+                Post.objects.create(
+                    author=cls.user, text=f'Кошка номер {number}'
+                )
+                for number in range(3)
+            ]
+            cls.dog = Post.objects.create(author=cls.user, text='Собака')
+
+    def test_search_finds_matching_posts(self):
+        posts, next_cursor = search('кошка', limit=10)
+        self.assertEqual(set(posts), set(self.posts))
+        self.assertIsNone(next_cursor)
+
+    def test_search_follows_edits_and_deletes(self):
+        dog = Post.objects.get(pk=self.dog.pk)
+        dog.text = 'Кошка в собачьей будке'
+        with self.captureOnCommitCallbacks(execute=True):
+            dog.save()
+        self.assertIn(dog, search('будке')[0])
+        with self.captureOnCommitCallbacks(execute=True):
+            dog.delete()
+        self.assertEqual(search('будке')[0], [])
+
+    def test_search_cursor_pages(self):
+        first, next_cursor = search('кошка', limit=2)
+        second, last_cursor = search('кошка', next_cursor, limit=2)
+        self.assertEqual(len(first), 2)
+        self.assertEqual(set(first + second), set(self.posts))
+        self.assertIsNone(last_cursor)
+
+    def test_search_page(self):
+        response = Client().get(reverse('posts:search'), {'q': 'Собака'})
+        self.assertEqual(list(response.context['posts']), [self.dog])
+
+    def test_index_table_is_created_in_migrated_database(self):
+        replica = mock.MagicMock(vendor='sqlite')
+        with mock.patch('posts.search.connections', {'replica': replica}):
+            create_index_table(using='replica')
+        cursor = replica.cursor.return_value.__enter__.return_value
+        self.assertIn('CREATE VIRTUAL TABLE', cursor.execute.call_args[0][0])
@@ -0,0 +1,71 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import tasks
+from core.models import Task
+from core.testing import OnCommitMixin
+from ..models import Comment, FeedEntry, Follow, Post
+from ..search import search
+
+User = get_user_model()
+
+
+class PostTasksTests(OnCommitMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='author', email='author@example.com'
+        )
+        cls.reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def test_comment_notification(self):
+        """Автор поста получает письмо о чужом комментарии."""
+        post = Post.objects.create(author=self.author, text='Пост')
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.create(
+                post=post, author=self.reader, text='Отзыв'
+            )
+            Comment.objects.create(
+                post=post, author=self.author, text='Ответ'
+            )
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['author@example.com'])
+        self.assertIn('Отзыв', mail.outbox[0].body)
+
+    def test_failed_task_keeps_post(self):
+        """Упавшая задача не превращает сохранение поста в ошибку."""
+        self.client.force_login(self.author)
+        with mock.patch(
+            'posts.search.index_post', side_effect=ValueError('сбой')
+        ):
+            with self.assertLogs('core.tasks', 'ERROR'):
+                with self.captureOnCommitCallbacks(execute=True):
+                    response = self.client.post(
+                        reverse('posts:post_create'), {'text': 'Сохранится'}
+                    )
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(Post.objects.filter(text='Сохранится').exists())
+
+    @override_settings(TASKS_EAGER=False)
+    def test_side_effects_are_queued(self):
+        """Раскладка по лентам и индексация ждут воркера."""
+        post = Post.objects.create(author=self.author, text='Очередь')
+        post.text = 'Очередь задач'
+        post.save()
+        self.assertEqual(
+            sorted(Task.objects.values_list('name', flat=True)),
+            ['posts.tasks.fan_out_post', 'posts.tasks.reindex_post']
+        )
+        self.assertFalse(FeedEntry.objects.filter(post=post).exists())
+        self.assertEqual(search('задач')[0], [])
+        tasks.run_pending()
+        self.assertTrue(
+            FeedEntry.objects.filter(post=post, user=self.reader).exists()
+        )
+        self.assertEqual(search('задач')[0], [post])
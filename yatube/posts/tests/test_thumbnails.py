@@ -0,0 +1,63 @@
+import shutil
+import tempfile
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from ..models import Post
+from ..thumbnails import generate
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Пост с картинкой',
+            image=SimpleUploadedFile(
+                name='small.gif',
+                content=SMALL_GIF,
+                content_type='image/gif'
+            )
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_original_image_until_thumbnail_ready(self):
+        """Пока миниатюры нет, показывается исходная картинка."""
+        response = Client().get(
+            reverse('posts:post_detail', args=(self.post.pk,))
+        )
+        self.assertContains(response, self.post.image.url)
+
+    def test_generated_thumbnail_is_shown(self):
+        """Готовая миниатюра сохраняется в посте и попадает в шаблон."""
+        generate(self.post.pk)
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertTrue(post.thumbnail)
+        response = Client().get(
+            reverse('posts:post_detail', args=(self.post.pk,))
+        )
+        self.assertContains(response, post.thumbnail.url)
@@ -0,0 +1,194 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.testing import OnCommitMixin
+from posts import follow_graph
+from posts.models import Comment, Follow, Group, Post, RemappedPost
+
+User = get_user_model()
+
+
+class TransferTestClass(OnCommitMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        for number in range(5):
+            post = Post.objects.create(
+                text=f'Пост, "в кавычках"\nномер {number}',
+                author=cls.author,
+                group=cls.group if number % 2 else None
+            )
+            Comment.objects.create(
+                post=post, author=cls.reader, text=f'Комментарий {number}'
+            )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def snapshot(self):
+        return {
+            'posts': list(Post.objects.order_by('pk').values_list(
+                'pk', 'author__username', 'group__slug', 'text', 'created',
+                'comments_count'
+            )),
+            'comments': list(Comment.objects.order_by('pk').values_list(
+                'pk', 'post', 'author__username', 'text', 'created'
+            )),
+            'groups': list(Group.objects.values_list('slug', 'title')),
+            'follows': list(Follow.objects.values_list(
+                'user__username', 'author__username'
+            )),
+        }
+
+    def test_round_trip(self):
+        expected = self.snapshot()
+        for format in ('ndjson', 'csv'):
+            with self.subTest(format=format):
+                call_command(
+                    'export_posts', self.directory, format=format,
+                    chunk_size=2, restart=True, stdout=StringIO()
+                )
+                Post.objects.all().delete()
+                Group.objects.all().delete()
+                User.objects.all().delete()
+                call_command(
+                    'import_posts', self.directory, format=format,
+                    batch_size=2, restart=True, stdout=StringIO()
+                )
+                self.assertEqual(self.snapshot(), expected)
+                self.assertEqual(
+                    User.objects.get(username='reader').stats.following_count,
+                    1
+                )
+
+    def test_import_is_idempotent(self):
+        expected = self.snapshot()
+        call_command('export_posts', self.directory, stdout=StringIO())
+        for _ in range(2):
+            call_command(
+                'import_posts', self.directory, restart=True,
+                stdout=StringIO()
+            )
+        self.assertEqual(self.snapshot(), expected)
+
+    def test_import_into_database_with_other_posts(self):
+        """Занятые чужими постами id не теряют посты и комментарии."""
+        call_command('export_posts', self.directory, stdout=StringIO())
+        exported = list(Post.objects.order_by('pk'))
+        Post.objects.all().delete()
+        other = User.objects.create_user(username='other')
+        taken = Post.objects.create(
+            id=exported[0].pk, author=other, text='Чужой пост'
+        )
+        for _ in range(2):
+            call_command(
+                'import_posts', self.directory, batch_size=2, restart=True,
+                stdout=StringIO()
+            )
+            self.assertEqual(Post.objects.count(), len(exported) + 1)
+            self.assertFalse(taken.comments.exists())
+            for post in exported:
+                imported = Post.objects.get(
+                    author=self.author, created=post.created
+                )
+                self.assertEqual(imported.text, post.text)
+                number = post.text[-1]
+                self.assertEqual(
+                    list(imported.comments.values_list('text', flat=True)),
+                    [f'Комментарий {number}']
+                )
+
+    def test_comments_find_remapped_posts_in_later_run(self):
+        call_command('export_posts', self.directory, stdout=StringIO())
+        exported = Post.objects.order_by('pk').first()
+        Post.objects.all().delete()
+        Post.objects.create(id=exported.pk, author=self.reader, text='Чужой')
+        call_command(
+            'import_posts', self.directory, kinds=['posts'],
+            skip_rebuild=True, stdout=StringIO()
+        )
+        imported = RemappedPost.objects.get(old_id=exported.pk).post
+        call_command(
+            'import_posts', self.directory, kinds=['comments'],
+            stdout=StringIO()
+        )
+        self.assertEqual(
+            list(imported.comments.values_list('text', flat=True)),
+            [f'Комментарий {exported.text[-1]}']
+        )
+
+    def test_posts_with_same_author_and_date_are_kept(self):
+        first, second = Post.objects.order_by('pk')[:2]
+        Post.objects.filter(pk=second.pk).update(created=first.created)
+        expected = self.snapshot()
+        call_command('export_posts', self.directory, stdout=StringIO())
+        Post.objects.all().delete()
+        call_command('import_posts', self.directory, stdout=StringIO())
+        self.assertEqual(self.snapshot(), expected)
+
+    def test_import_refreshes_follow_graph(self):
+        call_command('export_posts', self.directory, stdout=StringIO())
+        with self.captureOnCommitCallbacks(execute=True):
+            Follow.objects.all().delete()
+        self.assertEqual(follow_graph.following(self.reader), frozenset())
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('import_posts', self.directory, stdout=StringIO())
+        self.assertEqual(
+            follow_graph.following(self.reader), {self.author.pk}
+        )
+
+    def test_csv_keeps_empty_text(self):
+        Comment.objects.create(
+            post=Post.objects.first(), author=self.reader, text=''
+        )
+        expected = self.snapshot()
+        call_command(
+            'export_posts', self.directory, format='csv', stdout=StringIO()
+        )
+        Post.objects.all().delete()
+        call_command(
+            'import_posts', self.directory, format='csv', stdout=StringIO()
+        )
+        self.assertEqual(self.snapshot(), expected)
+
+    def test_export_resumes_from_checkpoint(self):
+        call_command(
+            'export_posts', self.directory, kinds=['posts'], chunk_size=2,
+            stdout=StringIO()
+        )
+        filename = os.path.join(self.directory, 'posts.ndjson')
+        with open(filename, encoding='utf-8') as file:
+            complete = file.read()
+        # Обрываем выгрузку после первой пачки: в файле лишняя строка.
+        checkpoint = os.path.join(self.directory, '.export_checkpoint.json')
+        with open(checkpoint, encoding='utf-8') as file:
+            state = json.load(file)
+        lines = complete.splitlines(keepends=True)
+        state['posts'].update(
+            rows=2, last=json.loads(lines[1])['id'],
+            offset=len(''.join(lines[:2]).encode()), done=False
+        )
+        with open(checkpoint, 'w', encoding='utf-8') as file:
+            json.dump(state, file)
+        with open(filename, 'w', encoding='utf-8') as file:
+            file.write(''.join(lines[:3]))
+        call_command(
+            'export_posts', self.directory, kinds=['posts'], chunk_size=2,
+            stdout=StringIO()
+        )
+        with open(filename, encoding='utf-8') as file:
+            self.assertEqual(file.read(), complete)
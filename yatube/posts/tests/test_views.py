@@ -8,8 +8,9 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 from http import HTTPStatus
-from ..models import Post, Group, Follow
-from ..views import POSTS_PER_PAGE
+from core.testing import OnCommitMixin
+from ..models import Comment, Post, Group, Follow
+from ..utils import COMMENTS_PER_PAGE, POSTS_PER_PAGE
 
 NUMBER_OF_POSTS_COPIES = 15
 
@@ -18,7 +19,7 @@ TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 
 
 @override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
-class PostsViewsTests(TestCase):
+class PostsViewsTests(OnCommitMixin, TestCase):
     @classmethod
     def setUpClass(cls):
         super().setUpClass()
@@ -131,10 +132,11 @@ class PostsViewsTests(TestCase):
         Новая запись пользователя появляется в ленте тех,
         кто на него подписан.
         """
-        new_post = Post.objects.create(
-            author=self.user,
-            text='Новый пост'
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            new_post = Post.objects.create(
+                author=self.user,
+                text='Новый пост'
+            )
         response = self.reader.get(reverse('posts:follow_index'))
         self.assertEqual(response.status_code, HTTPStatus.OK)
         self.assertIn(
@@ -161,19 +163,22 @@ class PostsViewsTests(TestCase):
 
     def test_cache_index_page(self):
         """Проверяем работу кеширования index"""
-        Post.objects.create(
-            author=self.user,
-            text='Тестирую кеш'
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            post = Post.objects.create(
+                author=self.user,
+                text='Тестирую кеш'
+            )
         response = self.post_author.get(reverse('posts:index'))
         self.assertEqual(response.status_code, HTTPStatus.OK)
         old_content = response.content
         self.assertEqual(response.context['page_obj'][0].text, 'Тестирую кеш')
-        Post.objects.first().delete()
+        # Запись в обход сигналов не сбрасывает кеш.
+        Post.objects.filter(pk=post.pk).update(text='Без сброса кеша')
         response = self.post_author.get(reverse('posts:index'))
         self.assertEqual(response.status_code, HTTPStatus.OK)
         self.assertEqual(response.content, old_content)
-        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            post.delete()
         response = self.post_author.get(reverse('posts:index'))
         self.assertEqual(response.status_code, HTTPStatus.OK)
         self.assertNotEqual(
@@ -181,6 +186,25 @@ class PostsViewsTests(TestCase):
             old_content
         )
 
+    def test_cache_invalidated_on_edit(self):
+        """Правка поста сразу видна на всех закешированных страницах."""
+        addresses = [
+            ('posts:index', None),
+            ('posts:group_post', (PostsViewsTests.group.slug,)),
+            ('posts:profile', (PostsViewsTests.user.username,)),
+            ('posts:post_detail', (PostsViewsTests.post.pk,)),
+        ]
+        for address, args in addresses:
+            self.post_author.get(reverse(address, args=args))
+        post = Post.objects.get(pk=PostsViewsTests.post.pk)
+        post.text = 'Отредактированный пост'
+        with self.captureOnCommitCallbacks(execute=True):
+            post.save()
+        for address, args in addresses:
+            with self.subTest(address=address):
+                response = self.post_author.get(reverse(address, args=args))
+                self.assertContains(response, 'Отредактированный пост')
+
     def test_url_templates(self):
         """Проверяем шаблоны"""
         group_slug = PostsViewsTests.group.slug
@@ -255,9 +279,13 @@ class PostsViewsTests(TestCase):
         for key, value in values.items():
             with self.subTest(key=key):
                 self.assertEqual(response.context[key], value)
+        # Картинки хранятся под именем по хешу содержимого.
         self.assertEqual(
             response.context['post'].image.name,
-            'posts/small.gif'
+            PostsViewsTests.post.image.name
+        )
+        self.assertRegex(
+            response.context['post'].image.name, r'^posts/\w\w/\w{64}\.gif$'
         )
 
     def test_template_create_post_correct_context(self):
@@ -367,3 +395,76 @@ class PaginatorViewsTest(TestCase):
                 self.assertEqual(len(
                     response.context['page_obj']),
                     number_of_posts)
+
+    def test_feed_fragments(self):
+        """Подгрузка отдаёт только карточки и адрес следующей порции."""
+        group_slug = PaginatorViewsTest.group.slug
+        username = PaginatorViewsTest.user.username
+        values = {
+            'posts:index_more': {},
+            'posts:group_more': {'slug': group_slug},
+            'posts:profile_more': {'username': username},
+            'posts:follow_more': {},
+        }
+        reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=reader, author=PaginatorViewsTest.user)
+        follower = Client()
+        follower.force_login(reader)
+        for name, kwargs in values.items():
+            with self.subTest(name=name):
+                url = reverse(name, kwargs=kwargs)
+                response = follower.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertNotContains(response, '<html')
+                self.assertEqual(
+                    len(response.context['page_obj']), POSTS_PER_PAGE
+                )
+                response = follower.get(url + response['X-Next-Page'])
+                self.assertEqual(
+                    len(response.context['page_obj']),
+                    NUMBER_OF_POSTS_COPIES - POSTS_PER_PAGE
+                )
+                self.assertFalse(response.has_header('X-Next-Page'))
+
+
+class CommentPaginationTests(OnCommitMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(author=cls.user, text='Пост')
+        Comment.objects.bulk_create(
+            Comment(post=cls.post, author=cls.user, text=f'Комментарий {i}')
+            for i in range(COMMENTS_PER_PAGE + 5)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_comments_are_paginated(self):
+        """На странице поста первая порция, остальное — подгрузкой."""
+        url = reverse('posts:post_detail', args=(self.post.pk,))
+        response = self.client.get(url)
+        self.assertEqual(len(response.context['comments']), COMMENTS_PER_PAGE)
+        more = reverse('posts:post_comments', args=(self.post.pk,))
+        self.assertContains(response, f'data-more="{more}?cursor=')
+        response = self.client.get(
+            more + f'?cursor={response.context["comments"].next_cursor}'
+        )
+        self.assertEqual(len(response.context['comments']), 5)
+        self.assertFalse(response.has_header('X-Next-Page'))
+        self.assertNotContains(response, '<html')
+
+    def test_first_page_is_cached_until_comment(self):
+        """Первая порция комментариев кешируется до нового комментария."""
+        url = reverse('posts:post_detail', args=(self.post.pk,))
+        self.client.get(url)
+        # Только пост: комментарии берутся из кеша фрагментов.
+        with self.settings(PAGE_CACHE=False):
+            with self.assertNumQueries(1):
+                self.client.get(url)
+            with self.captureOnCommitCallbacks(execute=True):
+                Comment.objects.create(
+                    post=self.post, author=self.user, text='Свежий'
+                )
+            self.assertContains(self.client.get(url), 'Свежий')
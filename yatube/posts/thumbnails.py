@@ -0,0 +1,33 @@
+from django.conf import settings
+from sorl.thumbnail import get_thumbnail
+
+from .models import Post
+from .signals import bump_post_versions
+from .tasks import process_image
+
+
+def generate(post_id):
+    """Строит миниатюру поста и запоминает её в Post.thumbnail."""
+    post = Post.objects.filter(pk=post_id).only(
+        'image', 'author', 'group'
+    ).first()
+    if post is None or not post.image:
+        return
+    thumbnail = get_thumbnail(
+        post.image,
+        settings.POST_THUMBNAIL_GEOMETRY,
+        **settings.POST_THUMBNAIL_OPTIONS
+    )
+    # Картинку могли заменить, пока строилась миниатюра старой.
+    updated = Post.objects.filter(
+        pk=post_id,
+        image=post.image.name
+    ).update(thumbnail=thumbnail.name)
+    if updated:
+        bump_post_versions(post)
+
+
+def schedule(post):
+    """Ставит обработку новой картинки в очередь фоновых задач."""
+    if post.image:
+        process_image.delay(post.pk, key=f'image:{post.pk}')
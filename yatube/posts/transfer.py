@@ -0,0 +1,305 @@
+"""
+Выгрузка и загрузка контента: группы, посты, комментарии и подписки.
+
+Каждый вид данных лежит в своём файле NDJSON или CSV. Строки читаются
+и пишутся генераторами, поэтому память не зависит от объёма. Авторы
+и группы ссылаются по username и slug, посты и комментарии по
+возможности сохраняют свои id. Если id занят другой записью, строка
+получает новый id, а старый id поста записывается в RemappedPost, по
+которой комментарии находят пост. Уже загруженный пост узнаётся по
+id выгрузки в RemappedPost или по автору, дате и тексту, и повторная
+загрузка его не дублирует.
+"""
+import csv
+import json
+import os
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.utils.dateparse import parse_datetime
+
+from core.cache import bump_version_on_commit
+from .models import Comment, Follow, Group, Post, RemappedPost
+
+User = get_user_model()
+FORMATS = ('ndjson', 'csv')
+KINDS = ('groups', 'posts', 'comments', 'follows')
+MODELS = {
+    'groups': Group,
+    'posts': Post,
+    'comments': Comment,
+    'follows': Follow,
+}
+FIELDS = {
+    'groups': ('id', 'title', 'slug', 'description'),
+    'posts': ('id', 'author', 'group', 'text', 'created', 'image'),
+    'comments': ('id', 'post', 'author', 'text', 'created'),
+    'follows': ('id', 'user', 'author'),
+}
+LOOKUPS = {
+    'groups': FIELDS['groups'],
+    'posts': (
+        'id', 'author__username', 'group__slug', 'text', 'created', 'image'
+    ),
+    'comments': ('id', 'post_id', 'author__username', 'text', 'created'),
+    'follows': ('id', 'user__username', 'author__username'),
+}
+# Пустое значение в CSV — «нет группы»; пустой текст остаётся строкой.
+NULLABLE = ('group',)
+
+
+def path(directory, kind, format):
+    return os.path.join(directory, f'{kind}.{format}')
+
+
+def export_rows(kind, after=0, chunk_size=2000):
+    """Строки вида данных с id больше after в порядке id."""
+    rows = MODELS[kind].objects.filter(pk__gt=after).order_by(
+        'pk'
+    ).values_list(*LOOKUPS[kind])
+    for row in rows.iterator(chunk_size=chunk_size):
+        row = dict(zip(FIELDS[kind], row))
+        if 'created' in row:
+            row['created'] = row['created'].isoformat()
+        yield row
+
+
+class Writer:
+    """Пишет строки одного вида данных в открытый текстовый файл."""
+
+    def __init__(self, file, kind, format, header=True):
+        self.file = file
+        self.csv = None
+        if format == 'csv':
+            self.csv = csv.DictWriter(file, FIELDS[kind])
+            if header:
+                self.csv.writeheader()
+
+    def write(self, row):
+        if self.csv:
+            self.csv.writerow(row)
+        else:
+            self.file.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+
+def read_rows(file, format):
+    """Строки файла как словари; в CSV пустые NULLABLE становятся None."""
+    if format == 'csv':
+        for row in csv.DictReader(file):
+            yield {
+                key: (value or None) if key in NULLABLE else value
+                for key, value in row.items()
+            }
+        return
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+def user_ids(usernames):
+    """{username: id}; недостающие авторы заводятся без пароля."""
+    usernames = set(usernames) - {None}
+    found = dict(User.objects.filter(
+        username__in=usernames
+    ).values_list('username', 'pk'))
+    missing = usernames - set(found)
+    if missing:
+        User.objects.bulk_create(
+            (User(username=username, password=UNUSABLE_PASSWORD_PREFIX)
+             for username in missing),
+            ignore_conflicts=True
+        )
+        found.update(User.objects.filter(
+            username__in=missing
+        ).values_list('username', 'pk'))
+    return found
+
+
+def build_objects(kind, rows):
+    """Объекты групп и подписок для пачки строк."""
+    if kind == 'groups':
+        return [
+            Group(title=row['title'], slug=row['slug'],
+                  description=row['description'] or '')
+            for row in rows
+        ]
+    users = user_ids(
+        [row['user'] for row in rows] + [row['author'] for row in rows]
+    )
+    return [
+        Follow(user_id=users[row['user']], author_id=users[row['author']])
+        for row in rows if row['user'] != row['author']
+    ]
+
+
+def _place(model, objects, existing):
+    """
+    Делит объекты на загруженные ранее, с прежним id и с новым.
+    existing — {естественный ключ: pk} уже лежащих в базе записей.
+    """
+    taken = set(model.objects.filter(
+        pk__in=[obj.pk for _, obj in objects]
+    ).values_list('pk', flat=True))
+    found, keep, moved = {}, [], []
+    for key, obj in objects:
+        if key in existing:
+            found[obj.pk] = existing[key]
+        elif obj.pk in taken:
+            # id занят чужой записью: база выдаст новый.
+            moved.append((key, obj))
+        else:
+            keep.append(obj)
+    return found, keep, moved
+
+
+def remapped_posts(old_ids):
+    """{id в выгрузке: id в базе} постов, загруженных под другим id."""
+    return dict(RemappedPost.objects.filter(
+        old_id__in=set(old_ids)
+    ).values_list('old_id', 'post'))
+
+
+def forget_remapped_posts():
+    """Загрузка постов начинается заново: старые соответствия не нужны."""
+    RemappedPost.objects.all().delete()
+
+
+def import_posts(rows):
+    """Загружает пачку постов; сменившие id записываются в RemappedPost."""
+    users = user_ids(row['author'] for row in rows)
+    groups = dict(Group.objects.filter(
+        slug__in={row['group'] for row in rows}
+    ).values_list('slug', 'pk'))
+    known = remapped_posts(int(row['id']) for row in rows)
+    objects = []
+    for row in rows:
+        post = Post(
+            id=int(row['id']), author_id=users[row['author']],
+            group_id=groups.get(row['group']), text=row['text'],
+            created=parse_datetime(row['created']), image=row['image'] or ''
+        )
+        if post.pk not in known:
+            key = (post.author_id, post.created, post.text)
+            objects.append((key, post))
+    existing = _existing_posts(key for key, _ in objects)
+    found, keep, moved = _place(Post, objects, existing)
+    remapped = {old: new for old, new in found.items() if old != new}
+    Post.objects.bulk_create(keep)
+    if moved:
+        old_ids = {key: post.pk for key, post in moved}
+        for _, post in moved:
+            post.pk = None
+        Post.objects.bulk_create([post for _, post in moved])
+        # SQLite не возвращает id из bulk_create: ищем по ключу.
+        created = _existing_posts(old_ids)
+        for key, old in old_ids.items():
+            remapped[old] = created[key]
+    RemappedPost.objects.bulk_create(
+        (RemappedPost(old_id=old, post_id=new)
+         for old, new in remapped.items()),
+        ignore_conflicts=True
+    )
+
+
+def _existing_posts(keys):
+    keys = set(keys)
+    posts = Post.objects.filter(
+        author__in={author for author, _, _ in keys},
+        created__in={created for _, created, _ in keys}
+    ).values_list('author', 'created', 'text', 'pk')
+    return {
+        (author, created, text): pk for author, created, text, pk in posts
+        if (author, created, text) in keys
+    }
+
+
+def import_comments(rows):
+    """Загружает пачку комментариев; посты ищутся с учётом RemappedPost."""
+    users = user_ids(row['author'] for row in rows)
+    remapped = remapped_posts(int(row['post']) for row in rows)
+    post_ids = {
+        row['id']: remapped.get(int(row['post']), int(row['post']))
+        for row in rows
+    }
+    posts = set(Post.objects.filter(
+        pk__in=set(post_ids.values())
+    ).values_list('pk', flat=True))
+    objects = []
+    for row in rows:
+        post_id = post_ids[row['id']]
+        if post_id not in posts:
+            continue
+        comment = Comment(
+            id=int(row['id']), post_id=post_id,
+            author_id=users[row['author']], text=row['text'],
+            created=parse_datetime(row['created'])
+        )
+        key = (
+            comment.post_id, comment.author_id, comment.created, comment.text
+        )
+        objects.append((key, comment))
+    keys = {key for key, _ in objects}
+    existing = {
+        (post, author, created, text): pk
+        for post, author, created, text, pk in Comment.objects.filter(
+            post__in={key[0] for key in keys},
+            created__in={key[2] for key in keys}
+        ).values_list('post', 'author', 'created', 'text', 'pk')
+    }
+    _, keep, moved = _place(Comment, objects, existing)
+    for _, comment in moved:
+        comment.pk = None
+    Comment.objects.bulk_create(keep + [comment for _, comment in moved])
+
+
+def import_batch(kind, rows):
+    """Загружает пачку строк одного вида данных."""
+    if kind == 'posts':
+        import_posts(rows)
+    elif kind == 'comments':
+        import_comments(rows)
+    else:
+        objects = build_objects(kind, rows)
+        MODELS[kind].objects.bulk_create(objects, ignore_conflicts=True)
+        if kind == 'follows':
+            # bulk_create не шлёт сигналов: графы подписок сбрасываем сами.
+            bump_version_on_commit(
+                *{f'follow:{follow.user_id}' for follow in objects}
+            )
+
+
+@contextmanager
+def keep_created():
+    """Отключает auto_now_add, чтобы сохранить исходные даты."""
+    fields = [
+        model._meta.get_field('created') for model in (Post, Comment)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Checkpoint:
+    """Прогресс по видам данных в JSON-файле, пишется атомарно."""
+
+    def __init__(self, filename, resume=True):
+        self.filename = filename
+        self.state = {}
+        if resume and os.path.exists(filename):
+            with open(filename, encoding='utf-8') as file:
+                self.state = json.load(file)
+
+    def get(self, kind):
+        return self.state.get(kind, {})
+
+    def save(self, kind, **state):
+        self.state[kind] = state
+        temporary = f'{self.filename}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump(self.state, file)
+        os.replace(temporary, self.filename)
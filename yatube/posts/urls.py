@@ -5,9 +5,21 @@ app_name = 'posts'
 
 urlpatterns = [
     path('group/<slug:slug>/', views.group_post, name='group_post'),
+    path('group/<slug:slug>/more/', views.group_more, name='group_more'),
     path('', views.index, name='index'),
+    path('more/', views.index_more, name='index_more'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path(
+        'profile/<str:username>/more/',
+        views.profile_more,
+        name='profile_more'
+    ),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments'
+    ),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path(
@@ -16,6 +28,8 @@ urlpatterns = [
         name='add_comment'
     ),
     path('follow/', views.follow_index, name='follow_index'),
+    path('follow/more/', views.follow_more, name='follow_more'),
+    path('search/', views.search, name='search'),
     path(
         'profile/<str:username>/follow/',
         views.profile_follow,
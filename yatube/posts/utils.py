@@ -0,0 +1,49 @@
+from urllib.parse import urlencode
+
+from django.utils.functional import SimpleLazyObject
+
+from core.paginator import CursorPaginator
+
+POSTS_PER_PAGE = 10
+COMMENTS_PER_PAGE = 20
+
+
+def paginate(request, posts, keys=('created', 'pk')):
+    """
+    Возвращает страницу ленты.
+
+    По умолчанию листаем курсором (?cursor=...), старые ссылки
+    вида ?page=N обслуживаются обычной постраничной навигацией.
+    """
+    paginator = CursorPaginator(posts, POSTS_PER_PAGE, keys=keys)
+    page_number = request.GET.get('page')
+    if page_number is not None:
+        return paginator.get_page(page_number)
+    return paginator.get_cursor_page(request.GET.get('cursor'))
+
+
+def paginate_comments(request, comments):
+    """
+    Страница комментариев по курсору. Запрос к базе откладывается до
+    рендеринга: страница из кеша фрагментов его не делает.
+    """
+    paginator = CursorPaginator(comments, COMMENTS_PER_PAGE)
+    return SimpleLazyObject(
+        lambda: paginator.get_cursor_page(request.GET.get('cursor'))
+    )
+
+
+def page_key(request):
+    """Номер страницы или курсор — часть ключа кеша фрагментов ленты."""
+    return request.GET.get('page') or request.GET.get('cursor')
+
+
+def next_page_query(page):
+    """Параметры адреса следующей страницы ленты или None."""
+    if getattr(page, 'cursor_based', False):
+        if page.next_cursor:
+            return urlencode({'cursor': page.next_cursor})
+        return None
+    if page.has_next():
+        return f'page={page.next_page_number()}'
+    return None
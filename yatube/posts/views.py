@@ -1,88 +1,189 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.db import transaction
+from django.urls import reverse
+from core.cache import get_version
+from core.page_cache import anonymous_page_cache
+from core.uploads import oversized_uploads
+from . import search as post_search, thumbnails
+from .counters import user_stats
+from .feed import FEED_KEYS, follow_feed
+from .follow_graph import is_following
 from .forms import CommentForm, PostForm
-from .models import Group, Post, User, Follow
+from .models import Comment, Post, User, Follow
+from .scopes import (
+    find_author, find_group, group_scope, post_scope, profile_scope
+)
+from .utils import (
+    POSTS_PER_PAGE, next_page_query, page_key, paginate, paginate_comments
+)
 
-POSTS_PER_PAGE = 10
 
-
-def index(request):
-    post_list = Post.objects.all()
-    paginator = Paginator(post_list, POSTS_PER_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    context = {
-        'page_number': page_number,
+def index_feed(request):
+    page_obj = paginate(request, Post.objects.for_feed())
+    return {
+        'page_number': page_key(request),
         'page_obj': page_obj,
+        'cache_version': get_version('posts', 'groups', 'users'),
+        'more_url': reverse('posts:index_more'),
     }
-    return render(request, 'posts/index.html', context)
 
 
-def group_post(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.group_posts.all()
-    paginator = Paginator(posts, POSTS_PER_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    template = 'posts/group_list.html'
-    context = {
+def group_feed(request, slug):
+    group = find_group(request, slug)
+    page_obj = paginate(request, group.group_posts.for_feed())
+    return {
         'group': group,
+        'page_number': page_key(request),
         'page_obj': page_obj,
+        'cache_version': get_version(f'group:{group.pk}', 'users'),
+        'more_url': reverse('posts:group_more', args=(slug,)),
     }
-    return render(request, template, context)
 
 
-def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    following = False
-    if request.user.is_authenticated:
-        following = Follow.objects.filter(
-            user=request.user,
-            author=author
-        ).exists()
-    posts = author.posts.all()
-    posts_count = posts.count()
-    paginator = Paginator(posts, POSTS_PER_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    title = f'Профайл пользователя {author.get_full_name()}'
-    context = {
-        'following': following,
-        'title': title,
-        'posts_count': posts_count,
+def profile_feed(request, username):
+    author = find_author(request, username)
+    page_obj = paginate(request, author.posts.for_feed())
+    return {
         'name': author,
+        'page_number': page_key(request),
         'page_obj': page_obj,
+        'cache_version': get_version(
+            f'profile:{author.pk}', 'groups', 'users'
+        ),
+        'more_url': reverse('posts:profile_more', args=(username,)),
     }
+
+
+def feed_fragment(request, template, context, page='page_obj'):
+    """
+    Только карточки страницы ленты — для подгрузки при прокрутке.
+    Адрес следующей порции — в заголовке X-Next-Page.
+    """
+    response = render(request, template, context)
+    query = next_page_query(context[page])
+    if query:
+        response['X-Next-Page'] = f'?{query}'
+    return response
+
+
+@anonymous_page_cache('posts', 'groups', 'users')
+def index(request):
+    return render(request, 'posts/index.html', index_feed(request))
+
+
+@anonymous_page_cache('posts', 'groups', 'users')
+def index_more(request):
+    return feed_fragment(
+        request, 'posts/includes/index_posts.html', index_feed(request)
+    )
+
+
+@anonymous_page_cache(group_scope, 'users')
+def group_post(request, slug):
+    return render(request, 'posts/group_list.html', group_feed(request, slug))
+
+
+@anonymous_page_cache(group_scope, 'users')
+def group_more(request, slug):
+    return feed_fragment(
+        request, 'posts/includes/group_posts.html', group_feed(request, slug)
+    )
+
+
+@anonymous_page_cache(profile_scope, 'groups', 'users')
+def profile(request, username):
+    context = profile_feed(request, username)
+    author = context['name']
+    context.update({
+        'following': is_following(request.user, [author])[author.pk],
+        'title': f'Профайл пользователя {author.get_full_name()}',
+        'posts_count': user_stats(author).posts_count,
+    })
     return render(request, 'posts/profile.html', context)
 
 
+@anonymous_page_cache(profile_scope, 'groups', 'users')
+def profile_more(request, username):
+    return feed_fragment(
+        request,
+        'posts/includes/profile_posts.html',
+        profile_feed(request, username)
+    )
+
+
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
-    posts_count = post.author.posts.all().count()
+    post = get_object_or_404(Post.objects.for_detail(), id=post_id)
+    posts_count = user_stats(post.author).posts_count
     comment_form = CommentForm(request.POST or None)
-    comments = post.comments.all()
     context = {
         'posts_count': posts_count,
         'post': post,
         'form': comment_form,
-        'comments': comments
+        'cache_version': get_version(
+            f'post:{post.pk}', f'profile:{post.author_id}', 'groups', 'users'
+        ),
     }
+    context.update(comments_page(request, post.pk))
     return render(request, 'posts/post_detail.html', context)
 
 
+def comments_page(request, post_id):
+    return {
+        'post_id': post_id,
+        'comments': paginate_comments(
+            request, Comment.objects.filter(post_id=post_id).for_post()
+        ),
+        'comments_page': page_key(request),
+        'comments_version': get_version(f'post:{post_id}', 'users'),
+        'more_url': reverse('posts:post_comments', args=(post_id,)),
+    }
+
+
+@anonymous_page_cache(post_scope, 'users')
+def post_comments(request, post_id):
+    """Следующая порция комментариев для кнопки «Показать ещё»."""
+    get_object_or_404(Post.objects.only('pk'), pk=post_id)
+    context = comments_page(request, post_id)
+    return feed_fragment(
+        request, 'posts/includes/comments.html', context, page='comments'
+    )
+
+
+def search(request):
+    query = request.GET.get('q', '')
+    posts, next_cursor = post_search.search(
+        query,
+        request.GET.get('cursor'),
+        POSTS_PER_PAGE
+    )
+    context = {
+        'query': query,
+        'posts': posts,
+        'next_cursor': next_cursor,
+    }
+    return render(request, 'posts/search.html', context)
+
+
 @login_required
+@transaction.atomic
 def post_create(request):
-    form = PostForm(request.POST or None)
+    form = PostForm(
+        request.POST or None,
+        files=request.FILES or None,
+        oversized=oversized_uploads(request)
+    )
     if request.method != 'POST' or not form.is_valid():
         return render(request, 'posts/create_post.html', {'form': form})
     post = form.save(commit=False)
     post.author = request.user
     post.save()
+    thumbnails.schedule(post)
     return redirect('posts:profile', post.author)
 
 
 @login_required
+@transaction.atomic
 def post_edit(request, post_id):
     post = get_object_or_404(Post, id=post_id)
     if request.user != post.author:
@@ -90,10 +191,16 @@ def post_edit(request, post_id):
     form = PostForm(
         request.POST or None,
         files=request.FILES or None,
-        instance=post
+        instance=post,
+        oversized=oversized_uploads(request)
     )
     if form.is_valid():
-        form.save()
+        post = form.save(commit=False)
+        if 'image' in form.changed_data:
+            post.thumbnail = ''
+        post.save()
+        if 'image' in form.changed_data:
+            thumbnails.schedule(post)
         return redirect('posts:post_detail', post_id)
     context = {
         'form': form,
@@ -103,6 +210,7 @@ def post_edit(request, post_id):
 
 
 @login_required
+@transaction.atomic
 def add_comment(request, post_id):
     post = get_object_or_404(Post, id=post_id)
     form = CommentForm(request.POST or None)
@@ -114,26 +222,34 @@ def add_comment(request, post_id):
     return redirect('posts:post_detail', post_id)
 
 
+def follow_feed_page(request):
+    posts = follow_feed(request.user).for_feed()
+    return {
+        'page_obj': paginate(request, posts, keys=FEED_KEYS),
+        'more_url': reverse('posts:follow_more'),
+    }
+
+
 @login_required
 def follow_index(request):
-    name = request.user
-    follows = request.user.follower.all()
-    authors = []
-    for follow in follows:
-        authors.append(follow.author)
-    posts_on_page = Post.objects.filter(author__in=authors)
-    paginator = Paginator(posts_on_page, POSTS_PER_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    title = f'Подписки пользователя {name.get_full_name()}'
-    context = {
-        'title': title,
-        'page_obj': page_obj,
-    }
+    context = follow_feed_page(request)
+    context['title'] = (
+        f'Подписки пользователя {request.user.get_full_name()}'
+    )
     return render(request, 'posts/follow.html', context)
 
 
 @login_required
+def follow_more(request):
+    return feed_fragment(
+        request,
+        'posts/includes/follow_posts.html',
+        follow_feed_page(request)
+    )
+
+
+@login_required
+@transaction.atomic
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
     if author == request.user:
@@ -146,6 +262,7 @@ def profile_follow(request, username):
 
 
 @login_required
+@transaction.atomic
 def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
     Follow.objects.filter(
@@ -0,0 +1,53 @@
+// Подгрузка ленты или комментариев при прокрутке: ссылка «Следующая»
+// с data-more заменяется запросом следующей порции без шапки и подвала.
+(function () {
+  'use strict';
+
+  function loadMore(link) {
+    var feed = document.querySelector('[data-feed]');
+    if (!feed || link.dataset.loading) {
+      return;
+    }
+    link.dataset.loading = '1';
+    fetch(link.dataset.more, {credentials: 'same-origin'})
+      .then(function (response) {
+        if (!response.ok) {
+          throw new Error(response.status);
+        }
+        return response.text().then(function (html) {
+          var separator = feed.hasAttribute('data-no-separator') ? '' : '<hr>';
+          feed.insertAdjacentHTML('beforeend', separator + html);
+          var next = response.headers.get('X-Next-Page');
+          if (!next) {
+            link.closest('nav').remove();
+            return;
+          }
+          link.href = next;
+          link.dataset.more = link.dataset.more.split('?')[0] + next;
+          delete link.dataset.loading;
+        });
+      })
+      .catch(function () {
+        // Без подгрузки остаётся обычный переход по ссылке.
+        link.removeAttribute('data-more');
+      });
+  }
+
+  document.addEventListener('DOMContentLoaded', function () {
+    var link = document.querySelector('a[data-more]');
+    if (!link || !('IntersectionObserver' in window)) {
+      return;
+    }
+    new IntersectionObserver(function (entries) {
+      if (entries[0].isIntersecting && link.dataset.more) {
+        loadMore(link);
+      }
+    }, {rootMargin: '400px'}).observe(link);
+    link.addEventListener('click', function (event) {
+      if (link.dataset.more) {
+        event.preventDefault();
+        loadMore(link);
+      }
+    });
+  });
+}());
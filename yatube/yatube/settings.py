@@ -45,6 +45,7 @@ INSTALLED_APPS = [
     'core.apps.CoreConfig',     # добавил приложение core
     'users.apps.UsersConfig',   # добавил приложение users
     'posts.apps.PostsConfig',   # Добавлено приложение posts
+    'api.apps.ApiConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -54,7 +55,13 @@ INSTALLED_APPS = [
     'sorl.thumbnail',
 ]
 
+# PROFILING=1 добавляет к ответам заголовок Server-Timing и копит
+# профиль запросов по view (команда profiling_stats).
+PROFILING = os.getenv('PROFILING') == '1'
+
 MIDDLEWARE = [
+    'core.middleware.ProfilingMiddleware',
+    'core.middleware.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -80,6 +87,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'core.context_processors.year.year',
+                'core.context_processors.cache.fragment_cache_timeout',
             ],
         },
     },
@@ -97,6 +105,44 @@ DATABASES = {
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
     }
 }
+# Проверять постоянные соединения (CONN_MAX_AGE) перед каждым запросом.
+DB_HEALTH_CHECKS = False
+# PRAGMA для каждого нового соединения SQLite, см. settings_production.
+SQLITE_PRAGMAS = {}
+
+# Реплики для чтения: DATABASE_REPLICAS=путь1,путь2 с настройками
+# основной базы. Локально реплику изображает копия db.sqlite3.
+DATABASE_REPLICAS = []
+for number, name in enumerate(
+    filter(None, os.getenv('DATABASE_REPLICAS', '').split(',')), 1
+):
+    DATABASES[f'replica_{number}'] = {
+        **DATABASES['default'],
+        'NAME': name,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica_{number}')
+DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+# Страницы, которые только читают и могут видеть данные с задержкой.
+REPLICA_VIEWS = {
+    'posts:index',
+    'posts:group_post',
+    'posts:profile',
+    'posts:post_detail',
+    'posts:follow_index',
+    'posts:search',
+    'about:author',
+    'about:tech',
+    'api:index',
+    'api:group_post',
+    'api:profile',
+    'api:post_detail',
+    'api:follow_index',
+}
+# Сколько секунд после записи пользователь читает с основной базы:
+# должно быть больше отставания реплик.
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', 5))
+REPLICA_PIN_COOKIE = 'primary_db'
 
 
 # Password validation
@@ -138,14 +184,114 @@ USE_TZ = True
 STATIC_URL = '/static/'
 
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+# Сюда собирает статику manage.py collectstatic.
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Загрузки пишутся сразу на диск, файлы больше лимита отбрасываются.
+FILE_UPLOAD_HANDLERS = ['core.uploads.LimitedUploadHandler']
+FILE_UPLOAD_MAX_SIZE = 10 * 2 ** 20
+
+# Отдача файлов (core.serving). Файлы с хешем в имени кешируются на
+# год, остальные — на FILES_MAX_AGE секунд. SENDFILE_BACKEND 'nginx'
+# или 'xsendfile' передаёт отправку байтов веб-серверу; для nginx
+# запрос уходит на internal-location SENDFILE_URL + адрес файла.
+FILES_MAX_AGE = 60 * 60
+SENDFILE_BACKEND = os.getenv('SENDFILE_BACKEND', '')
+SENDFILE_URL = '/protected/'
+
+# Кеш выбирается переменными окружения. locmem у каждого процесса свой,
+# поэтому в продакшене нужен общий бэкенд: redis или memcached
+# (нужны пакеты django-redis или python-memcached), на одном сервере
+# хватит file или db (для db выполните manage.py createcachetable).
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'redis': 'django_redis.cache.RedisCache',
+    'memcached': 'django.core.cache.backends.memcached.MemcachedCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'db': 'django.core.cache.backends.db.DatabaseCache',
+}
+CACHE_LOCATIONS = {
+    'redis': 'redis://127.0.0.1:6379/1',
+    'memcached': '127.0.0.1:11211',
+    'file': os.path.join(BASE_DIR, 'cache'),
+    'db': 'yatube_cache',
+}
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'locmem')
+
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND],
+        'LOCATION': os.getenv(
+            'CACHE_LOCATION',
+            CACHE_LOCATIONS.get(CACHE_BACKEND, '')
+        ),
+        'KEY_PREFIX': 'yatube',
     }
 }
+
+# CACHE_STATS=1 считает попадания в кеш (команда cache_stats),
+# профилированию счётчики нужны для Server-Timing.
+if os.getenv('CACHE_STATS') == '1' or PROFILING:
+    CACHES['default'] = {
+        'BACKEND': 'core.cache_stats.StatsCache',
+        'WRAPPED': CACHES['default'],
+    }
+
+# Фрагменты лент версионируются и сбрасываются при записи,
+# поэтому их можно хранить долго.
+FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 6
+# Сколько ещё секунд устаревший фрагмент отдаётся, пока его
+# перестраивает другой запрос ({% fragment_cache %}).
+FRAGMENT_CACHE_STALE = 60 * 60
+FRAGMENT_CACHE_LOCK_TIMEOUT = 10
+# Насколько заранее фрагменты перестраиваются до срока: 0 — не заранее.
+FRAGMENT_CACHE_BETA = 1.0
+
+# Кеш целых страниц лент для анонимов (core.page_cache).
+PAGE_CACHE = True
+PAGE_CACHE_TIMEOUT = 60 * 60
+# Сколько секунд живёт блокировка построения страницы и сколько
+# ждёт её запрос, которому нечего отдать.
+PAGE_CACHE_LOCK_TIMEOUT = 10
+PAGE_CACHE_LOCK_WAIT = 2
+
+# Лента подписок: при публикации пост раскладывается по лентам
+# подписчиков. Посты авторов, у которых подписчиков больше лимита,
+# не раскладываются, а подмешиваются в ленту при чтении.
+FEED_FANOUT = True
+FEED_FANOUT_FOLLOWERS_LIMIT = 10000
+FEED_FANOUT_BATCH_SIZE = 1000
+
+# Множества подписок пользователей в кеше (posts.follow_graph), секунды.
+# Подписка и отписка сдвигают версию, срок лишь освобождает память.
+FOLLOW_GRAPH_TIMEOUT = 60 * 60 * 24
+
+# Картинки постов: не больше POST_IMAGE_MAX_PIXELS при загрузке, в фоне
+# пережимаются до POST_IMAGE_MAX_SIDE по большей стороне без метаданных.
+POST_IMAGE_MAX_PIXELS = 40 * 10 ** 6
+POST_IMAGE_MAX_SIDE = 1920
+POST_IMAGE_FORMAT = 'WEBP'
+POST_IMAGE_QUALITY = 82
+
+# Миниатюры картинок постов строятся в фоне после сохранения формы.
+POST_THUMBNAIL_GEOMETRY = '960x339'
+POST_THUMBNAIL_OPTIONS = {'crop': 'center', 'upscale': True}
+
+# Фоновые задачи (core.tasks). При разработке и в тестах выполняются
+# сразу, в settings_production — воркерами команды run_tasks.
+TASKS_EAGER = os.getenv('TASKS_EAGER', '1') == '1'
+# Через сколько секунд задачу упавшего воркера заберёт другой.
+TASKS_LEASE = 5 * 60
+# Пауза перед первым повтором, дальше удваивается.
+TASKS_RETRY_DELAY = 10
+
+# Адрес сайта для ссылок в письмах.
+SITE_URL = os.getenv('SITE_URL', 'http://localhost:8000')
+
+# Конфигурация полнотекстового поиска PostgreSQL.
+SEARCH_CONFIG = 'russian'
@@ -0,0 +1,66 @@
+"""
+Настройки для продакшена: DJANGO_SETTINGS_MODULE=yatube.settings_production.
+
+Соединения с базой живут между запросами, а SQLite работает в режиме
+WAL: читатели не ждут писателя. Замер — manage.py bench_sqlite.
+Шаблоны кешируются в памяти процесса.
+Фоновые задачи выполняют воркеры manage.py run_tasks.
+Статика собирается manage.py collectstatic с хешами в именах и
+сжатыми копиями, файлы пересылает веб-сервер (SENDFILE_BACKEND).
+"""
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES, TEMPLATES
+
+DEBUG = False
+ALLOWED_HOSTS = os.getenv(
+    'ALLOWED_HOSTS', 'localhost,127.0.0.1,[::1]'
+).split(',')
+
+DATABASES = {
+    alias: {**params, 'CONN_MAX_AGE': int(os.getenv('CONN_MAX_AGE', 600))}
+    for alias, params in DATABASES.items()
+}
+DB_HEALTH_CHECKS = True
+
+# Шаблоны разбираются один раз на процесс: без кеширующего загрузчика
+# каждый {% include %} заново читает и разбирает файл. Замер —
+# manage.py profile_templates.
+TEMPLATES = [
+    {
+        **engine,
+        'APP_DIRS': False,
+        'OPTIONS': {
+            **engine['OPTIONS'],
+            'debug': False,
+            'loaders': [(
+                'django.template.loaders.cached.Loader',
+                [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ],
+            )],
+        },
+    }
+    for engine in TEMPLATES
+]
+
+# Имена статики с хешем содержимого и сжатые копии: core.staticfiles.
+STATICFILES_STORAGE = 'core.staticfiles.CompressedManifestStaticFilesStorage'
+SENDFILE_BACKEND = os.getenv('SENDFILE_BACKEND', 'nginx')
+
+# Побочные эффекты записи уходят в очередь: manage.py run_tasks.
+TASKS_EAGER = False
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    # В WAL режим normal не портит базу при сбое, теряется лишь
+    # последняя транзакция при отключении питания.
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    # Отрицательное значение — размер в КиБ: 64 МиБ страничного кеша.
+    'cache_size': -64 * 1024,
+    'temp_store': 'memory',
+}
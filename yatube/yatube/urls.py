@@ -13,15 +13,23 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
 from django.contrib import admin
 from django.conf import settings
-from django.conf.urls.static import static
-from django.urls import include, path
+from django.urls import include, path, re_path
+
+from core import views as core_views
+
+
+def files(prefix, view):
+    return re_path(r'^%s(?P<path>.*)$' % re.escape(prefix.lstrip('/')), view)
 
 
 urlpatterns = [
     path('', include('posts.urls', namespace='posts')),
     path('about/', include('about.urls', namespace='about')),
+    path('api/v1/', include('api.urls', namespace='api')),
     path('admin/', admin.site.urls),
     path('auth/', include('users.urls', namespace='users')),
     path('auth/', include('django.contrib.auth.urls')),
@@ -31,7 +39,9 @@ handler404 = 'core.views.page_not_found'
 handler500 = 'core.views.server_error'
 handler403 = 'core.views.permission_denied'
 
-if settings.DEBUG:
-    urlpatterns += static(
-        settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
-    )
+# При DEBUG статику из STATICFILES_DIRS отдаёт runserver, в продакшене
+# файлы отдаются через core.serving: байты пересылает веб-сервер.
+urlpatterns += [
+    files(settings.STATIC_URL, core_views.static),
+    files(settings.MEDIA_URL, core_views.media),
+]